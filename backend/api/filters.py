@@ -1,29 +1,116 @@
+from django import forms
+from django.db.models import Exists, F, OuterRef
 from django_filters import rest_framework as filters
 from rest_framework import filters as rest_framework_filters
 
-from recipes.models import Recipe, Tag
+from recipes.models import Favorite, Recipe, ShoppingCart
+from utils.search import search_ingredients, search_recipes
+from utils.services import get_tag_ids
+
+
+class MultipleValueField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        return [item for item in value or () if item]
+
+
+class MultipleValueFilter(filters.Filter):
+    field_class = MultipleValueField
 
 
 class RecipesFilter(filters.FilterSet):
-    is_favorited = filters.BooleanFilter()
-    is_in_shopping_cart = filters.BooleanFilter()
+    is_favorited = filters.BooleanFilter(method='filter_is_favorited')
+    is_in_shopping_cart = filters.BooleanFilter(
+        method='filter_is_in_shopping_cart'
+    )
     author = filters.NumberFilter(
         'author__id',
         lookup_expr='exact'
     )
-    tags = filters.ModelMultipleChoiceFilter(
-        field_name='tags__slug',
-        to_field_name='slug',
-        queryset=Tag.objects.all()
-    )
+    tags = MultipleValueFilter(method='filter_tags')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Recipe
         fields = (
             'is_favorited', 'is_in_shopping_cart',
-            'author', 'tags',
+            'author', 'tags', 'search',
+        )
+
+    def filter_by_user_relation(self, queryset, relation_model_cls, value):
+        user = self.request.user
+
+        if not user.is_authenticated:
+            return queryset.none() if value else queryset
+
+        recipe_ids = relation_model_cls.objects.filter(
+            user=user
+        ).values('recipe')
+
+        if value:
+            return queryset.filter(pk__in=recipe_ids)
+
+        return queryset.exclude(pk__in=recipe_ids)
+
+    def filter_is_favorited(self, queryset, name, value):
+        return self.filter_by_user_relation(queryset, Favorite, value)
+
+    def filter_is_in_shopping_cart(self, queryset, name, value):
+        return self.filter_by_user_relation(queryset, ShoppingCart, value)
+
+    def filter_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
+
+    def filter_tags(self, queryset, name, value):
+        tag_ids = get_tag_ids(value)
+
+        if not tag_ids:
+            return queryset.none()
+
+        return queryset.filter(
+            Exists(
+                Recipe.tags.through.objects.filter(
+                    recipe=OuterRef('pk'), tag__in=tag_ids
+                )
+            )
         )
 
 
-class IngredientsSearchFilter(rest_framework_filters.SearchFilter):
+class IngredientsSearchFilter(rest_framework_filters.BaseFilterBackend):
     search_param = 'name'
+
+    def filter_queryset(self, request, queryset, view):
+        name = request.query_params.get(self.search_param, '').strip()
+
+        if not name or view.action != 'list':
+            return queryset
+
+        return search_ingredients(queryset, name)
+
+
+class RecipesOrderingFilter(rest_framework_filters.BaseFilterBackend):
+    ordering_param = 'ordering'
+    orderings = {
+        'newest': ('-id',),
+        'quickest': ('cooking_time', 'id'),
+        'popular': ('-popularity', '-id'),
+    }
+
+    def get_ordering(self, request):
+        return self.orderings.get(
+            request.query_params.get(self.ordering_param)
+        )
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request)
+
+        if ordering is None:
+            return queryset
+
+        if ordering == self.orderings['popular']:
+            queryset = queryset.filter(
+                score__isnull=False
+            ).annotate(popularity=F('score__score'))
+
+        return queryset.order_by(*ordering)
@@ -0,0 +1,177 @@
+import hashlib
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import quote_etag
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from utils.cache import (
+    get_cached_fragments,
+    get_or_compute,
+    get_request_cache_key,
+)
+
+
+def render_cached_content(response):
+    content = JSONRenderer().render(response.data)
+    return quote_etag(hashlib.md5(content).hexdigest()), content
+
+
+def get_cached_content_response(request, etag, content):
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(content, content_type='application/json')
+
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, no_cache=True)
+
+    return response
+
+
+def get_cached_response(namespace, request, handler, get_keys, timeout,
+                        known_keys=()):
+    uncached = {}
+
+    def compute():
+        response = handler()
+        if response.status_code != status.HTTP_200_OK:
+            uncached['response'] = response
+            return None
+
+        return render_cached_content(response), get_keys(response.data)
+
+    cached = get_or_compute(
+        namespace=namespace,
+        key=get_request_cache_key(namespace, request),
+        compute=compute,
+        timeout=timeout,
+        known_keys=known_keys,
+    )
+    if cached is None:
+        return uncached['response']
+
+    return get_cached_content_response(request, *cached)
+
+
+class CachedReadOnlyMixin:
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            request, super().list, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            request, super().retrieve, *args, **kwargs
+        )
+
+    def get_cached_response(self, request, handler, *args, **kwargs):
+        if request.accepted_renderer.format != 'json':
+            return handler(request, *args, **kwargs)
+
+        return get_cached_response(
+            namespace=self.cache_namespace,
+            request=request,
+            handler=lambda: handler(request, *args, **kwargs),
+            get_keys=lambda data: (self.cache_namespace,),
+            timeout=settings.REFERENCE_DATA_CACHE_TIMEOUT,
+            known_keys=(self.cache_namespace,),
+        )
+
+
+class AnonymousCachedMixin:
+    """
+    The view provides get_known_surrogate_keys(request) and
+    get_surrogate_keys(request, data).
+    """
+    anonymous_cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        return self.get_anonymous_cached_response(
+            request, super().list, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_anonymous_cached_response(
+            request, super().retrieve, *args, **kwargs
+        )
+
+    def get_anonymous_cached_response(self, request, handler, *args, **kwargs):
+        if (
+            request.user.is_authenticated
+            or request.accepted_renderer.format != 'json'
+        ):
+            return handler(request, *args, **kwargs)
+
+        response = get_cached_response(
+            namespace=self.anonymous_cache_namespace,
+            request=request,
+            handler=lambda: handler(request, *args, **kwargs),
+            get_keys=lambda data: self.get_surrogate_keys(request, data),
+            timeout=settings.RESPONSE_CACHE_TIMEOUT,
+            known_keys=self.get_known_surrogate_keys(request),
+        )
+        patch_vary_headers(response, ('Authorization',))
+
+        return response
+
+
+class FragmentCachedMixin:
+    """
+    The view provides render_fragments(ids), get_fragment_keys(fragment),
+    get_fragment_known_keys(id) and overlay_fragments(fragments).
+    """
+    fragment_cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        if not self.uses_fragment_cache():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+
+        if page is None:
+            return Response(self.get_fragments(queryset))
+
+        return self.get_paginated_response(self.get_fragments(page))
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.uses_fragment_cache():
+            return super().retrieve(request, *args, **kwargs)
+
+        fragments = self.get_fragments((self.get_object(),))
+
+        if not fragments:
+            raise Http404
+
+        return Response(fragments[0])
+
+    def uses_fragment_cache(self):
+        return (
+            self.action in ('list', 'retrieve')
+            and self.request.user.is_authenticated
+            and self.request.accepted_renderer.format == 'json'
+        )
+
+    def get_fragments(self, instances):
+        origin = self.request.build_absolute_uri('/')
+
+        return self.overlay_fragments(
+            get_cached_fragments(
+                namespace=self.fragment_cache_namespace,
+                scope=hashlib.md5(origin.encode()).hexdigest(),
+                ids=[instance.pk for instance in instances],
+                render=self.render_fragments,
+                get_keys=self.get_fragment_keys,
+                get_known_keys=self.get_fragment_known_keys,
+                timeout=settings.FRAGMENT_CACHE_TIMEOUT,
+            )
+        )
@@ -1,5 +1,160 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from collections import OrderedDict
 
+from django.db import connections
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
 
-class Pagination(PageNumberPagination):
+
+def get_approximate_count(queryset):
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    sql, params = queryset.order_by().query.get_compiler(
+        using=queryset.db
+    ).as_sql()
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+
+    return plan[0]['Plan']['Plan Rows']
+
+
+class Pagination(pagination.PageNumberPagination):
     page_size_query_param = 'limit'
+
+
+class CursorPagination(pagination.CursorPagination):
+    ordering = '-id'
+    page_size_query_param = 'limit'
+    count_query_param = 'count'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', self.ordering)
+
+        if isinstance(ordering, str):
+            return (ordering,)
+
+        return tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(self.count_query_param) == 'approximate':
+            self.count = get_approximate_count(queryset)
+
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse, current_position = False, None
+        if self.cursor is not None:
+            reverse, current_position = self.cursor[1:]
+
+        queryset = queryset.order_by(
+            *(
+                pagination._reverse_ordering(self.ordering)
+                if reverse else self.ordering
+            )
+        )
+        if current_position is not None:
+            queryset = queryset.filter(
+                self.get_position_filter(current_position, reverse)
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None
+            self.has_previous = following_position is not None
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = following_position is not None
+            self.has_previous = current_position is not None
+            self.next_position = following_position
+            self.previous_position = current_position
+
+        return self.page
+
+    def get_position_filter(self, position, reverse):
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        position_filter = None
+        for order, value in reversed(tuple(zip(self.ordering, values))):
+            name = order.lstrip('-')
+            lookup = 'lt' if order.startswith('-') != reverse else 'gt'
+            condition = Q(**{f'{name}__{lookup}': value})
+
+            if position_filter is not None:
+                condition |= Q(**{name: value}) & position_filter
+            position_filter = condition
+
+        first = self.ordering[0]
+        lookup = 'lte' if first.startswith('-') != reverse else 'gte'
+
+        return Q(**{f'{first.lstrip("-")}__{lookup}': values[0]}) & (
+            position_filter
+        )
+
+    def _get_position_from_instance(self, instance, ordering):
+        return json.dumps(
+            [getattr(instance, order.lstrip('-')) for order in ordering]
+        )
+
+    def get_paginated_response(self, data):
+        response = OrderedDict()
+        if self.count is not None:
+            response['count'] = self.count
+        response['next'] = self.get_next_link()
+        response['previous'] = self.get_previous_link()
+        response['results'] = data
+
+        return Response(response)
+
+
+class OptionalCursorPagination(Pagination):
+    mode_query_param = 'pagination'
+    cursor_pagination_class = CursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+
+        if (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_pagination_class.cursor_query_param
+            in request.query_params
+        ):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+
+        return super().get_paginated_response(data)
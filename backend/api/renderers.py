@@ -0,0 +1,64 @@
+import csv
+import json
+
+from rest_framework import renderers
+
+
+class ShoppingListRenderer(renderers.BaseRenderer):
+    charset = 'utf-8'
+
+    def stream(self, items):
+        raise NotImplementedError(
+            'ShoppingListRenderer.stream() must be implemented.'
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            return json.dumps(data, ensure_ascii=False).encode(self.charset)
+        return ''.join(self.stream(data)).encode(self.charset)
+
+
+class ShoppingListTextRenderer(ShoppingListRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def stream(self, items):
+        separator = ''
+        for item in items:
+            yield (
+                f'{separator}{item["name"]}, {item["measurement_unit"]} - '
+                f'{item["amount"]}'
+            )
+            separator = '\n'
+
+
+class Echo:
+
+    def write(self, value):
+        return value
+
+
+class ShoppingListCSVRenderer(ShoppingListRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, items):
+        writer = csv.writer(Echo())
+        yield writer.writerow(('name', 'measurement_unit', 'amount'))
+        for item in items:
+            yield writer.writerow(
+                (item['name'], item['measurement_unit'], item['amount'])
+            )
+
+
+class ShoppingListJSONRenderer(ShoppingListRenderer):
+    media_type = 'application/json'
+    format = 'json'
+
+    def stream(self, items):
+        separator = ''
+        yield '['
+        for item in items:
+            yield separator + json.dumps(item, ensure_ascii=False)
+            separator = ', '
+        yield ']'
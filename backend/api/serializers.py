@@ -1,10 +1,8 @@
 from collections import defaultdict
 
 from django.contrib.auth import get_user_model
-from drf_extra_fields.fields import Base64ImageField
+from django.db import transaction
 from rest_framework import serializers
-from rest_framework.generics import get_object_or_404
-from rest_framework.validators import UniqueTogetherValidator
 
 from recipes.models import (
     Favorite,
@@ -12,9 +10,11 @@ from recipes.models import (
     Recipe,
     RecipeIngredient,
     ShoppingCart,
+    ShoppingListItem,
     Tag,
 )
 from users.serializers import UserSerializer
+from utils.fields import ImageVariantsField, LimitedBase64ImageField
 
 User = get_user_model()
 
@@ -60,7 +60,8 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
 
 class RecipeSerializer(serializers.ModelSerializer):
 
-    image = Base64ImageField()
+    image = LimitedBase64ImageField()
+    image_variants = ImageVariantsField()
     author = UserSerializer(read_only=True)
     ingredients = RecipeIngredientSerializer(
         source='recipeingredient_set', many=True, read_only=True
@@ -71,7 +72,7 @@ class RecipeSerializer(serializers.ModelSerializer):
 
     class Meta:
         fields = (
-            'id', 'name', 'text', 'author', 'image',
+            'id', 'name', 'text', 'author', 'image', 'image_variants',
             'cooking_time', 'ingredients', 'tags',
             'is_favorited', 'is_in_shopping_cart',
         )
@@ -85,6 +86,9 @@ class RecipeSerializer(serializers.ModelSerializer):
             errors['ingredients'].append(
                 'Missing field or empty value.'
             )
+            raise serializers.ValidationError(detail=errors)
+
+        ids = []
 
         for ingredient_data in ingredients_data:
             id = ingredient_data.get('id')
@@ -92,38 +96,25 @@ class RecipeSerializer(serializers.ModelSerializer):
                 errors['ingredients'].append('Missing field \'id\'.')
                 continue
 
-            ingredient = Ingredient.objects.filter(pk=id)
-            if not ingredient.exists():
-                errors['ingredients'].append(
-                    f'Ingredient with id = {id} not found.'
-                )
+            ids.append(id)
 
-            amount = ingredient_data.get('amount')
-            if amount is None:
-                errors['ingredients'].append('Missing field \'amount\'.')
-                continue
+            error = self._get_amount_error(ingredient_data.get('amount'))
+            if error is not None:
+                errors['ingredients'].append(error)
 
-            if type(amount) not in (int, str):
-                errors['ingredients'].append(
-                    'Field \'amount\' must be a number.'
-                )
-                continue
+        ingredients = Ingredient.objects.in_bulk(self._parse_ids(ids))
 
-            if type(amount) == str and not amount.isdigit():
+        for id in ids:
+            if self._parse_id(id) not in ingredients:
                 errors['ingredients'].append(
-                    'Field \'amount\' must be a number.'
-                )
-                continue
-
-            if int(amount) <= 0:
-                errors['ingredients'].append(
-                    'Field \'amount\' must be greater than 0.'
+                    f'Ingredient with id = {id} not found.'
                 )
-                continue
 
         if errors:
             raise serializers.ValidationError(detail=errors)
 
+        return ingredients
+
     def validate_tags(self, tags_data):
 
         errors = defaultdict(list)
@@ -132,10 +123,16 @@ class RecipeSerializer(serializers.ModelSerializer):
             errors['tags'].append(
                 'Missing field or empty value.'
             )
+            raise serializers.ValidationError(detail=errors)
+
+        tag_ids = set(
+            Tag.objects.filter(
+                pk__in=self._parse_ids(tags_data)
+            ).values_list('pk', flat=True)
+        )
 
         for tag_id in tags_data:
-            tag = Tag.objects.filter(pk=tag_id)
-            if not tag.exists():
+            if self._parse_id(tag_id) not in tag_ids:
                 errors['tags'].append(
                     f'Tag with id = {tag_id} not found.'
                 )
@@ -143,47 +140,128 @@ class RecipeSerializer(serializers.ModelSerializer):
         if errors:
             raise serializers.ValidationError(detail=errors)
 
-    def create(self, validated_data):
+        return tag_ids
 
-        ingredients_data = self.initial_data.get('ingredients')
-        tags_data = self.initial_data.get('tags')
+    @staticmethod
+    def _get_amount_error(amount):
+        if amount is None:
+            return 'Missing field \'amount\'.'
 
-        self.validate_ingredients(ingredients_data)
-        self.validate_tags(tags_data)
+        if type(amount) not in (int, str):
+            return 'Field \'amount\' must be a number.'
 
-        recipe = Recipe.objects.create(**validated_data)
+        if type(amount) is str and not amount.isdigit():
+            return 'Field \'amount\' must be a number.'
 
-        recipe_ingredients = []
+        if int(amount) <= 0:
+            return 'Field \'amount\' must be greater than 0.'
+
+        return None
+
+    @staticmethod
+    def _parse_id(value):
+        if type(value) is int:
+            return value
+
+        if type(value) is str and value.isdigit():
+            return int(value)
+
+        return None
+
+    @classmethod
+    def _parse_ids(cls, values):
+        ids = (cls._parse_id(value) for value in values)
+        return [id for id in ids if id is not None]
+
+    def _get_ingredient_amounts(self, ingredients_data):
+        amounts = defaultdict(int)
 
         for ingredient_data in ingredients_data:
-            ingredient = get_object_or_404(
-                Ingredient, pk=ingredient_data['id']
+            id = self._parse_id(ingredient_data['id'])
+            amounts[id] += int(ingredient_data['amount'])
+
+        return amounts
+
+    def _update_ingredients(self, recipe, ingredients_data, ingredients):
+        amounts = self._get_ingredient_amounts(ingredients_data)
+
+        current = {}
+        removed = []
+        old_amounts = defaultdict(int)
+
+        for recipe_ingredient in recipe.recipeingredient_set.all():
+            old_amounts[recipe_ingredient.ingredient_id] += (
+                recipe_ingredient.amount
             )
-            recipe_ingredients.append(
-                RecipeIngredient(
-                    recipe=recipe,
-                    ingredient=ingredient,
-                    amount=ingredient_data['amount']
-                )
+            if (
+                recipe_ingredient.ingredient_id not in amounts
+                or recipe_ingredient.ingredient_id in current
+            ):
+                removed.append(recipe_ingredient.pk)
+                continue
+            current[recipe_ingredient.ingredient_id] = recipe_ingredient
+
+        changed = []
+
+        for id, recipe_ingredient in current.items():
+            if recipe_ingredient.amount != amounts[id]:
+                recipe_ingredient.amount = amounts[id]
+                changed.append(recipe_ingredient)
+
+        added = [
+            RecipeIngredient(
+                recipe=recipe, ingredient=ingredients[id], amount=amount
             )
+            for id, amount in amounts.items() if id not in current
+        ]
+
+        if removed:
+            RecipeIngredient.objects.filter(pk__in=removed).delete()
+
+        if changed:
+            RecipeIngredient.objects.bulk_update(changed, ('amount',))
+
+        if added:
+            RecipeIngredient.objects.bulk_create(added)
+
+        if old_amounts:
+            ShoppingListItem.objects.update_recipe(
+                recipe.pk, old_amounts, amounts
+            )
+
+    def _reload(self, recipe):
+        return Recipe.objects.with_related().with_user_flags(
+            self.context['request'].user
+        ).get(pk=recipe.pk)
+
+    @transaction.atomic
+    def create(self, validated_data):
+
+        ingredients_data = self.initial_data.get('ingredients')
+        tags_data = self.initial_data.get('tags')
 
-        RecipeIngredient.objects.bulk_create(recipe_ingredients)
+        ingredients = self.validate_ingredients(ingredients_data)
+        tag_ids = self.validate_tags(tags_data)
 
-        for tag in tags_data:
-            recipe.tags.add(tag)
+        recipe = Recipe.objects.create(**validated_data)
+
+        self._update_ingredients(recipe, ingredients_data, ingredients)
 
-        return recipe
+        recipe.tags.set(tag_ids)
 
+        return self._reload(recipe)
+
+    @transaction.atomic
     def update(self, instance, validated_data):
 
         ingredients_data = self.initial_data.get('ingredients')
         tags_data = self.initial_data.get('tags')
 
         if ingredients_data is not None:
-            self.validate_ingredients(ingredients_data)
+            ingredients = self.validate_ingredients(ingredients_data)
 
         if tags_data is not None:
-            self.validate_tags(tags_data)
+            tag_ids = self.validate_tags(tags_data)
 
         instance.name = validated_data.get('name', instance.name)
         instance.text = validated_data.get('text', instance.text)
@@ -193,62 +271,30 @@ class RecipeSerializer(serializers.ModelSerializer):
         )
 
         if ingredients_data is not None:
-
-            for current_ingredient in instance.ingredients.all():
-                RecipeIngredient.objects.get(
-                    recipe=instance, ingredient=current_ingredient
-                ).delete()
-
-            recipe_ingredients = []
-
-            for ingredient_data in ingredients_data:
-                ingredient = get_object_or_404(
-                    Ingredient, pk=ingredient_data['id']
-                )
-                recipe_ingredients.append(
-                    RecipeIngredient(
-                        recipe=instance,
-                        ingredient=ingredient,
-                        amount=ingredient_data['amount']
-                    )
-                )
-
-            RecipeIngredient.objects.bulk_create(recipe_ingredients)
+            self._update_ingredients(instance, ingredients_data, ingredients)
 
         if tags_data is not None:
-            instance.tags.set(tags_data)
+            instance.tags.set(tag_ids)
 
         instance.save()
-        return instance
+        return self._reload(instance)
 
 
 class FavoriteSerializer(serializers.ModelSerializer):
+    unique_message = 'Recipe is already in favorites.'
 
     class Meta:
         fields = (
             'user', 'recipe',
         )
         model = Favorite
-        validators = (
-            UniqueTogetherValidator(
-                queryset=Favorite.objects.all(),
-                fields=('user', 'recipe',),
-                message='Recipe is already in favorites.',
-            ),
-        )
 
 
 class ShoppingCartSerializer(serializers.ModelSerializer):
+    unique_message = 'Recipe is already in shopping cart.'
 
     class Meta:
         fields = (
             'user', 'recipe',
         )
         model = ShoppingCart
-        validators = (
-            UniqueTogetherValidator(
-                queryset=ShoppingCart.objects.all(),
-                fields=('user', 'recipe',),
-                message='Recipe is already in shopping cart.',
-            ),
-        )
@@ -0,0 +1,258 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import mixins
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    Tag,
+)
+from users.models import Subscription
+
+User = get_user_model()
+
+
+def create_user(username):
+    return User.objects.create_user(
+        username=username, email=f'{username}@foodgram.test',
+        password='password', first_name=username, last_name=username,
+    )
+
+
+def create_recipes(authors, tags, ingredients, count):
+    recipes = []
+
+    for index in range(count):
+        recipe = Recipe.objects.create(
+            name=f'Recipe {index}', text=f'Text {index}',
+            author=authors[index % len(authors)],
+            image='recipes/images/recipe.png', cooking_time=index + 1,
+        )
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient=ingredients[(index + offset) % len(ingredients)],
+                amount=offset + 1,
+            )
+            for offset in range(3)
+        )
+        recipe.tags.set(tags[:index % len(tags) + 1])
+        recipes.append(recipe)
+
+    return recipes
+
+
+def get_token_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}'
+    )
+    return client
+
+
+class RecipeFixtureMixin:
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tags = [
+            Tag.objects.create(
+                name=f'Tag {index}', color=f'#00000{index}',
+                slug=f'tag-{index}',
+            )
+            for index in range(3)
+        ]
+        cls.ingredients = [
+            Ingredient.objects.create(
+                name=f'Ingredient {index}', measurement_unit='g'
+            )
+            for index in range(6)
+        ]
+        cls.authors = [create_user(f'author{index}') for index in range(3)]
+        cls.recipes = create_recipes(
+            cls.authors, cls.tags, cls.ingredients, 12
+        )
+
+        cls.user = create_user('reader')
+        Favorite.objects.create(user=cls.user, recipe=cls.recipes[0])
+        ShoppingCart.objects.create(user=cls.user, recipe=cls.recipes[1])
+        Subscription.objects.create(user=cls.user, following=cls.authors[0])
+
+    def setUp(self):
+        cache.clear()
+        self.anonymous_client = APIClient()
+        self.user_client = get_token_client(self.user)
+
+
+class RecipeQueryBudgetTests(RecipeFixtureMixin, TestCase):
+    page_sizes = (1, 5, 12)
+
+    def assert_list_queries(self, client, queries):
+        for limit in self.page_sizes:
+            cache.clear()
+            with self.subTest(limit=limit), self.assertNumQueries(queries):
+                response = client.get(
+                    reverse('api:recipes-list'), {'limit': limit}
+                )
+            self.assertEqual(len(response.json()['results']), limit)
+
+    def assert_retrieve_queries(self, client, queries):
+        for recipe in self.recipes[:3]:
+            cache.clear()
+            url = reverse('api:recipes-detail', args=(recipe.pk,))
+            with self.subTest(url=url), self.assertNumQueries(queries):
+                response = client.get(url)
+            self.assertEqual(response.json()['id'], recipe.pk)
+
+    def test_anonymous_list(self):
+        self.assert_list_queries(self.anonymous_client, 4)
+
+    def test_authenticated_list(self):
+        self.assert_list_queries(self.user_client, 8)
+
+    def test_anonymous_retrieve(self):
+        self.assert_retrieve_queries(self.anonymous_client, 3)
+
+    def test_authenticated_retrieve(self):
+        self.assert_retrieve_queries(self.user_client, 7)
+
+    def test_cached_anonymous_list(self):
+        url = reverse('api:recipes-list')
+        self.anonymous_client.get(url, {'limit': 5})
+
+        with self.assertNumQueries(0):
+            self.anonymous_client.get(url, {'limit': 5})
+
+    def test_cached_authenticated_list(self):
+        url = reverse('api:recipes-list')
+        self.user_client.get(url, {'limit': max(self.page_sizes)})
+
+        for limit in self.page_sizes:
+            with self.subTest(limit=limit), self.assertNumQueries(5):
+                self.user_client.get(url, {'limit': limit})
+
+    def test_user_flags(self):
+        response = self.user_client.get(
+            reverse('api:recipes-list'), {'limit': 12}
+        )
+        recipes = {
+            recipe['id']: recipe for recipe in response.json()['results']
+        }
+
+        self.assertTrue(recipes[self.recipes[0].pk]['is_favorited'])
+        self.assertFalse(recipes[self.recipes[1].pk]['is_favorited'])
+        self.assertTrue(recipes[self.recipes[1].pk]['is_in_shopping_cart'])
+        self.assertTrue(
+            recipes[self.recipes[0].pk]['author']['is_subscribed']
+        )
+        self.assertFalse(
+            recipes[self.recipes[1].pk]['author']['is_subscribed']
+        )
+
+
+class RecipeRelationFilterTests(RecipeFixtureMixin, TestCase):
+
+    def get_ids(self, client, **params):
+        response = client.get(
+            reverse('api:recipes-list'), {'limit': 100, **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return {recipe['id'] for recipe in response.json()['results']}
+
+    def test_anonymous_selected_relation_is_empty(self):
+        for name in ('is_favorited', 'is_in_shopping_cart'):
+            with self.subTest(name=name):
+                self.assertEqual(
+                    self.get_ids(self.anonymous_client, **{name: 1}), set()
+                )
+
+    def test_anonymous_unselected_relation_is_unfiltered(self):
+        all_ids = {recipe.pk for recipe in self.recipes}
+
+        for name in ('is_favorited', 'is_in_shopping_cart'):
+            with self.subTest(name=name):
+                self.assertEqual(
+                    self.get_ids(self.anonymous_client, **{name: 0}),
+                    all_ids,
+                )
+
+    def test_user_relations(self):
+        all_ids = {recipe.pk for recipe in self.recipes}
+        relations = (
+            ('is_favorited', {self.recipes[0].pk}),
+            ('is_in_shopping_cart', {self.recipes[1].pk}),
+        )
+
+        for name, ids in relations:
+            with self.subTest(name=name):
+                self.assertEqual(
+                    self.get_ids(self.user_client, **{name: 1}), ids
+                )
+                self.assertEqual(
+                    self.get_ids(self.user_client, **{name: 0}),
+                    all_ids - ids,
+                )
+
+
+class CacheStampedeTests(RecipeFixtureMixin, TransactionTestCase):
+    clients_count = 8
+
+    def setUp(self):
+        self.setUpTestData()
+        super().setUp()
+
+    def get_concurrently(self, url):
+        barrier = threading.Barrier(self.clients_count)
+
+        def get(index):
+            try:
+                client = APIClient()
+                barrier.wait()
+                return client.get(url)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(self.clients_count) as executor:
+            return list(executor.map(get, range(self.clients_count)))
+
+    def assert_computed_once(self, url):
+        computations = []
+        list_view = mixins.ListModelMixin.list
+
+        def compute(*args, **kwargs):
+            computations.append(url)
+            time.sleep(0.2)
+            return list_view(*args, **kwargs)
+
+        with mock.patch.object(
+            mixins.ListModelMixin, 'list', autospec=True,
+            side_effect=compute,
+        ):
+            responses = self.get_concurrently(url)
+
+        self.assertEqual(len(computations), 1)
+        self.assertEqual(len(responses), self.clients_count)
+        self.assertEqual(
+            {response.status_code for response in responses}, {200}
+        )
+        self.assertEqual(
+            len({response.content for response in responses}), 1
+        )
+
+    def test_ingredients(self):
+        self.assert_computed_once(reverse('api:ingredients-list'))
+
+    def test_anonymous_recipes(self):
+        self.assert_computed_once(reverse('api:recipes-list'))
@@ -1,14 +1,38 @@
-from django.db.models import Exists, OuterRef
-from django.http import HttpResponse
+from django.db.models import Value
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, viewsets
 from rest_framework.decorators import action
 
 from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
 from utils.serializers import ReadOnlyRecipeSerializer
-from utils.services import alter_model_related_with_user, create_shopping_cart
-from .filters import IngredientsSearchFilter, RecipesFilter
+from utils.services import (
+    alter_model_related_with_user,
+    alter_models_related_with_user,
+    get_following_ids,
+    get_shopping_list,
+    get_shopping_list_etag,
+    get_tag_ids,
+)
+from .filters import (
+    IngredientsSearchFilter,
+    RecipesFilter,
+    RecipesOrderingFilter,
+)
+from .mixins import (
+    AnonymousCachedMixin,
+    CachedReadOnlyMixin,
+    FragmentCachedMixin,
+)
+from .pagination import OptionalCursorPagination
 from .permissions import RecipePermissions
+from .renderers import (
+    ShoppingListCSVRenderer,
+    ShoppingListJSONRenderer,
+    ShoppingListTextRenderer,
+)
 from .serializers import (
     FavoriteSerializer,
     IngredientSerializer,
@@ -18,46 +42,132 @@ from .serializers import (
 )
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CachedReadOnlyMixin, viewsets.ReadOnlyModelViewSet):
+    cache_namespace = 'tags'
     serializer_class = TagSerializer
     queryset = Tag.objects.all()
     pagination_class = None
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CachedReadOnlyMixin, viewsets.ReadOnlyModelViewSet):
+    cache_namespace = 'ingredients'
     serializer_class = IngredientSerializer
     queryset = Ingredient.objects.all()
     filter_backends = (IngredientsSearchFilter,)
-    search_fields = ('^name',)
     pagination_class = None
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(AnonymousCachedMixin, FragmentCachedMixin,
+                    viewsets.ModelViewSet):
+    anonymous_cache_namespace = 'recipe-responses'
+    fragment_cache_namespace = 'recipe-fragments'
     serializer_class = RecipeSerializer
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, RecipesOrderingFilter)
     filterset_class = RecipesFilter
     permission_classes = (RecipePermissions,)
+    pagination_class = OptionalCursorPagination
+
+    @property
+    def cursor_ordering(self):
+        return RecipesOrderingFilter().get_ordering(self.request) or '-id'
 
     def get_queryset(self):
-        user = self.request.user
-        queryset = Recipe.objects.all()
+        if self.action in ('favorite', 'shopping_cart'):
+            return Recipe.objects.defer('search_vector')
 
-        if user.is_authenticated:
+        if self.uses_fragment_cache():
+            return Recipe.objects.only('id', 'cooking_time')
 
-            favorited_subquery = Favorite.objects.filter(
-                user=user, recipe=OuterRef('pk')
-            )
+        return Recipe.objects.with_related().with_user_flags(
+            self.request.user
+        )
 
-            in_shopping_cart_subquery = ShoppingCart.objects.filter(
-                user=user, recipe=OuterRef('pk')
-            )
+    def get_known_surrogate_keys(self, request):
+        keys = {'ingredients'}
 
-            return queryset.annotate(
-                is_favorited=Exists(favorited_subquery)).annotate(
-                    is_in_shopping_cart=Exists(in_shopping_cart_subquery)
-            )
+        if self.action == 'retrieve':
+            pk = self.kwargs.get('pk', '')
+            if pk.isdigit():
+                keys.add(f'recipe:{int(pk)}')
+            return keys
+
+        keys.add('recipes-list')
+
+        params = request.query_params
+        keys.update(
+            f'tag-recipes:{id}'
+            for id in get_tag_ids(params.getlist('tags'))
+        )
+        if params.get('search') or params.get('ordering') == 'quickest':
+            keys.add('recipes-content')
+        if params.get('ordering') == 'popular':
+            keys.add('recipe-scores')
+
+        return keys
+
+    def get_surrogate_keys(self, request, data):
+        if self.action == 'retrieve':
+            recipes = (data,)
+        else:
+            recipes = data['results'] if isinstance(data, dict) else data
+
+        keys = self.get_known_surrogate_keys(request)
+        for recipe in recipes:
+            keys.update(self.get_fragment_keys(recipe))
+
+        return keys
+
+    def get_fragment_keys(self, recipe):
+        return {
+            *self.get_fragment_known_keys(recipe['id']),
+            f'author:{recipe["author"]["id"]}',
+            *(f'tag:{tag["id"]}' for tag in recipe['tags']),
+        }
+
+    def get_fragment_known_keys(self, id):
+        return {'ingredients', f'recipe:{id}'}
+
+    def render_fragments(self, ids):
+        serializer = self.get_serializer(
+            Recipe.objects.with_related().filter(pk__in=ids), many=True
+        )
 
-        return queryset
+        fragments = {}
+        for recipe in serializer.data:
+            recipe['author'].pop('is_subscribed')
+            fragments[recipe['id']] = recipe
+
+        return fragments
+
+    def overlay_fragments(self, fragments):
+        user = self.request.user
+        ids = [fragment['id'] for fragment in fragments]
+        following_ids = get_following_ids(self.request)
+        favorites, cart = (
+            relation_model_cls.objects.filter(
+                user=user, recipe__in=ids
+            ).annotate(flag=Value(flag)).values_list('recipe', 'flag')
+            for relation_model_cls, flag in (
+                (Favorite, 'is_favorited'),
+                (ShoppingCart, 'is_in_shopping_cart'),
+            )
+        )
+        flags = set(favorites.union(cart))
+
+        return [
+            {
+                **fragment,
+                'author': {
+                    **fragment['author'],
+                    'is_subscribed':
+                        fragment['author']['id'] in following_ids,
+                },
+                'is_favorited': (fragment['id'], 'is_favorited') in flags,
+                'is_in_shopping_cart':
+                    (fragment['id'], 'is_in_shopping_cart') in flags,
+            }
+            for fragment in fragments
+        ]
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
@@ -74,6 +184,18 @@ class RecipeViewSet(viewsets.ModelViewSet):
             instance_szr_cls=ReadOnlyRecipeSerializer,
         )
 
+    @action(detail=False, methods=('POST', 'DELETE'),
+            url_path='favorite', url_name='favorite-bulk',
+            permission_classes=(permissions.IsAuthenticated,))
+    def favorite_bulk(self, request):
+        return alter_models_related_with_user(
+            request=request,
+            field_name='recipe',
+            queryset=Recipe.objects.all(),
+            relation_model_cls=Favorite,
+            relation_szr_cls=FavoriteSerializer,
+        )
+
     @action(detail=True, methods=('POST', 'DELETE'),
             permission_classes=(permissions.IsAuthenticated,))
     def shopping_cart(self, request, pk):
@@ -86,16 +208,41 @@ class RecipeViewSet(viewsets.ModelViewSet):
             instance_szr_cls=ReadOnlyRecipeSerializer,
         )
 
+    @action(detail=False, methods=('POST', 'DELETE'),
+            url_path='shopping_cart', url_name='shopping-cart-bulk',
+            permission_classes=(permissions.IsAuthenticated,))
+    def shopping_cart_bulk(self, request):
+        return alter_models_related_with_user(
+            request=request,
+            field_name='recipe',
+            queryset=Recipe.objects.all(),
+            relation_model_cls=ShoppingCart,
+            relation_szr_cls=ShoppingCartSerializer,
+        )
+
     @action(detail=False, methods=('GET',),
             permission_classes=(permissions.IsAuthenticated,),
-            serializer_class=ReadOnlyRecipeSerializer)
+            serializer_class=ReadOnlyRecipeSerializer,
+            renderer_classes=(ShoppingListTextRenderer,
+                              ShoppingListCSVRenderer,
+                              ShoppingListJSONRenderer))
     def download_shopping_cart(self, request):
-        response = HttpResponse(
-            create_shopping_cart(request.user),
-            content_type='text/plain; charset=UTF-8'
+        renderer = request.accepted_renderer
+        etag = quote_etag(
+            f'{get_shopping_list_etag(request.user)}-{renderer.format}'
+        )
+
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            return response
+
+        response = StreamingHttpResponse(
+            renderer.stream(get_shopping_list(request.user)),
+            content_type=f'{renderer.media_type}; charset=UTF-8'
         )
         response['Content-Disposition'] = (
-            'attachment; filename=shopping_cart.txt'
+            f'attachment; filename=shopping_cart.{renderer.format}'
         )
+        response['ETag'] = etag
 
         return response
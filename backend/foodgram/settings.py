@@ -81,6 +81,34 @@ if DEBUG:
         }
     }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', 'memcached:11211'),
+    }
+}
+
+if DEBUG:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+REFERENCE_DATA_CACHE_TIMEOUT = 60 * 60 * 24
+
+RESPONSE_CACHE_TIMEOUT = 60 * 10
+
+FRAGMENT_CACHE_TIMEOUT = 60 * 60
+
+CACHE_STALE_TIMEOUT = 60 * 5
+
+CACHE_LEASE_TIMEOUT = 10
+
+CACHE_LEASE_WAIT = 2
+
+CACHE_LEASE_POLL_INTERVAL = 0.05
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -114,6 +142,16 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+DEFAULT_FILE_STORAGE = 'utils.storage.ContentAddressedStorage'
+
+RECIPE_IMAGE_MAX_SIZE = 5 * 1024 * 1024
+
+RECIPE_IMAGE_MAX_PIXELS = 40_000_000
+
+RECIPE_IMAGE_MAX_DIMENSION = 2048
+
+JOB_MAX_ATTEMPTS = 3
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.User'
@@ -126,6 +164,12 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
 }
 
+INGREDIENT_SEARCH_LIMIT = 20
+
+RECIPE_POPULARITY_HALF_LIFE_DAYS = 7
+
+BULK_RELATION_MAX_IDS = 100
+
 DJOSER = {
     'LOGIN_FIELD': 'email',
     'HIDE_USERS': False,
@@ -6,6 +6,7 @@ from .models import (
     Recipe,
     RecipeIngredient,
     ShoppingCart,
+    ShoppingListItem,
     Tag,
 )
 
@@ -59,7 +60,18 @@ class RecipeAdmin(admin.ModelAdmin):
         return '; '.join(f'{tag}' for tag in obj.tags.all())
 
     def get_in_favorites(self, obj):
-        return Favorite.objects.filter(recipe=obj).count()
+        return obj.favorites_count
+
+    def save_related(self, request, form, formsets, change):
+        old_amounts = ShoppingListItem.objects.get_recipe_amounts(
+            form.instance
+        )
+        super().save_related(request, form, formsets, change)
+        ShoppingListItem.objects.update_recipe(
+            form.instance.pk,
+            old_amounts,
+            ShoppingListItem.objects.get_recipe_amounts(form.instance),
+        )
 
     get_ingredients.short_description = 'ingredients'
     get_tags.short_description = 'tags'
@@ -0,0 +1,17 @@
+from utils.images import update_image_variants
+from .models import Recipe
+
+
+def process_recipe_image(recipe_id, image):
+    recipe = Recipe.objects.filter(pk=recipe_id, image=image).first()
+
+    if recipe is not None:
+        update_image_variants(recipe)
+
+
+def delete_recipe_images(names):
+    storage = Recipe._meta.get_field('image').storage
+
+    for name in names:
+        if name:
+            storage.delete(name)
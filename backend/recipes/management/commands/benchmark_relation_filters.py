@@ -0,0 +1,126 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+
+from api.filters import RecipesFilter
+from recipes.models import Favorite, Recipe
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the is_favorited filter against growing catalogs and '
+        'favorites; all rows are rolled back'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--catalog-sizes', type=int, nargs='+',
+            default=[1000, 10000, 50000],
+            help='Numbers of recipes in the catalog',
+        )
+        parser.add_argument(
+            '--favorites', type=int, nargs='+', default=[10, 100, 1000],
+            help='Numbers of recipes favorited by the user',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Number of timed runs per measurement',
+        )
+        parser.add_argument(
+            '--page-size', type=int, default=10,
+            help='Number of recipes fetched per page',
+        )
+
+    def time_filter(self, user, repeat, page_size):
+        request = RequestFactory().get('/')
+        request.user = user
+        timings = []
+
+        for _ in range(repeat):
+            started = time.perf_counter()
+            queryset = RecipesFilter(
+                {'is_favorited': '1'},
+                queryset=Recipe.objects.order_by('-id'),
+                request=request,
+            ).qs
+            queryset.count()
+            list(queryset.values_list('pk', flat=True)[:page_size])
+            timings.append(time.perf_counter() - started)
+
+        return statistics.median(timings) * 1000
+
+    def fill_catalog(self, author, size):
+        missing = size - Recipe.objects.count()
+        Recipe.objects.bulk_create(
+            (
+                Recipe(
+                    name=f'Benchmark recipe {index}', text='Benchmark',
+                    author=author, image='recipes/images/benchmark.png',
+                    cooking_time=1,
+                )
+                for index in range(max(missing, 0))
+            ),
+            batch_size=1000,
+        )
+
+    def create_user(self, username, favorites):
+        user = User.objects.create(
+            username=username, email=f'{username}@benchmark.test'
+        )
+        Favorite.objects.bulk_create(
+            (
+                Favorite(user=user, recipe_id=recipe_id)
+                for recipe_id in Recipe.objects.order_by('?').values_list(
+                    'pk', flat=True
+                )[:favorites]
+            ),
+            batch_size=1000,
+        )
+
+        return user
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1 or options['page_size'] < 1:
+            raise CommandError(
+                '--repeat and --page-size must be greater than 0.'
+            )
+
+        catalog_sizes = sorted(options['catalog_sizes'])
+        favorites = sorted(options['favorites'])
+
+        self.stdout.write(
+            'recipes/favorites'.ljust(20)
+            + ''.join(f'{count:>12}' for count in favorites)
+        )
+
+        with transaction.atomic():
+            author = User.objects.create(
+                username='benchmark-author', email='author@benchmark.test'
+            )
+
+            for size in catalog_sizes:
+                self.fill_catalog(author, size)
+                timings = []
+
+                for count in favorites:
+                    user = self.create_user(
+                        f'benchmark-{size}-{count}', count
+                    )
+                    timings.append(
+                        self.time_filter(
+                            user, options['repeat'], options['page_size']
+                        )
+                    )
+
+                self.stdout.write(
+                    f'{Recipe.objects.count():<20}'
+                    + ''.join(f'{timing:>10.2f}ms' for timing in timings)
+                )
+
+            transaction.set_rollback(True)
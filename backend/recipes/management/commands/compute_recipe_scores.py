@@ -0,0 +1,100 @@
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from recipes.models import Favorite, Recipe, RecipeScore, ShoppingCart
+from utils.cache import bump_versions_on_commit
+
+
+class Command(BaseCommand):
+    help = 'Recompute recipe popularity scores from favorites and cart adds'
+
+    event_weights = (
+        (Favorite, 1.0),
+        (ShoppingCart, 0.5),
+    )
+    max_half_lives = 10
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of rows read or written per query',
+        )
+
+    def collect_scores(self, now, batch_size):
+        half_life = timedelta(
+            days=settings.RECIPE_POPULARITY_HALF_LIFE_DAYS
+        ).total_seconds()
+        since = now - timedelta(seconds=half_life * self.max_half_lives)
+        scores = defaultdict(float)
+
+        for model, weight in self.event_weights:
+            events = model.objects.filter(
+                created__gte=since
+            ).values_list('recipe', 'created').iterator(chunk_size=batch_size)
+
+            for recipe_id, created in events:
+                age = (now - created).total_seconds()
+                scores[recipe_id] += weight * 0.5 ** (age / half_life)
+
+        return scores
+
+    def get_candidate_scores(self, scores, batch_size):
+        yield from RecipeScore.objects.exclude(score=0).iterator(
+            chunk_size=batch_size
+        )
+
+        recipe_ids = list(scores)
+        for start in range(0, len(recipe_ids), batch_size):
+            yield from RecipeScore.objects.filter(
+                score=0, recipe__in=recipe_ids[start:start + batch_size]
+            )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be greater than 0.')
+
+        scores = self.collect_scores(timezone.now(), batch_size)
+
+        with transaction.atomic():
+            changed = []
+
+            for recipe_score in self.get_candidate_scores(scores, batch_size):
+                score = round(scores.get(recipe_score.recipe_id, 0.0), 6)
+                if score != recipe_score.score:
+                    recipe_score.score = score
+                    changed.append(recipe_score)
+
+            RecipeScore.objects.bulk_update(
+                changed, ('score',), batch_size=batch_size
+            )
+
+            missing = [
+                RecipeScore(
+                    recipe_id=recipe_id,
+                    score=round(scores.get(recipe_id, 0.0), 6),
+                )
+                for recipe_id in Recipe.objects.filter(
+                    ~Exists(RecipeScore.objects.filter(recipe=OuterRef('pk')))
+                ).values_list('pk', flat=True).iterator(chunk_size=batch_size)
+            ]
+            RecipeScore.objects.bulk_create(
+                missing, batch_size=batch_size, ignore_conflicts=True
+            )
+
+            if changed or missing:
+                bump_versions_on_commit(('recipe-scores',))
+
+        self.stdout.write(
+            f'Updated {len(changed)} and created {len(missing)} scores in '
+            f'{time.perf_counter() - started:.3f}s.'
+        )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe
+from utils.images import update_image_variants
+
+
+class Command(BaseCommand):
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.only('id', 'image', 'image_variants')
+
+        for recipe in recipes.iterator():
+            if recipe.image:
+                update_image_variants(recipe)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                'Image variants have been generated successfully!'
+            )
+        )
@@ -1,9 +1,11 @@
 import os
-import shutil
 
 from django.conf import settings
+from django.core.files import File
 from django.core.management.base import BaseCommand
 
+from recipes.models import Recipe
+
 
 class Command(BaseCommand):
 
@@ -12,11 +14,18 @@ class Command(BaseCommand):
             settings.BASE_DIR, '..', 'data', 'images'
         )
 
-        media_images_path = os.path.join(
-            settings.MEDIA_ROOT, 'recipes', 'images'
-        )
+        storage = Recipe._meta.get_field('image').storage
+
+        for recipe in Recipe.objects.only('id', 'image').iterator():
+            filename = os.path.basename(recipe.image.name)
+            path = os.path.join(fixture_images_path, filename)
+
+            if not filename or not os.path.exists(path):
+                continue
 
-        if os.path.exists(media_images_path):
-            shutil.rmtree(media_images_path)
+            with open(path, 'rb') as image_file:
+                name = storage.save(filename, File(image_file))
 
-        shutil.copytree(fixture_images_path, media_images_path)
+            Recipe.objects.filter(pk=recipe.pk).update(
+                image=name, image_variants={}
+            )
@@ -1,27 +1,98 @@
+import csv
 import json
 import os
+import time
 
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
 from recipes import models
 
 
 class Command(BaseCommand):
+    help = 'Load ingredients from a JSON or CSV file'
 
-    def handle(self, *args, **options):
-        filepath = os.path.join(
-            settings.BASE_DIR, '..', 'data', 'ingredients.json'
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(
+                settings.BASE_DIR, '..', 'data', 'ingredients.json'
+            ),
+            help='Path to ingredients.json or ingredients.csv',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of ingredients inserted per query',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report what would be loaded without writing anything',
         )
 
+    def read_json(self, ingredients_file):
+        for ingredient in json.load(ingredients_file):
+            yield ingredient['name'], ingredient['measurement_unit']
+
+    def read_csv(self, ingredients_file):
+        for row in csv.reader(ingredients_file):
+            if row:
+                yield row[0], row[1]
+
+    def read_ingredients(self, filepath):
+        readers = {
+            '.json': self.read_json,
+            '.csv': self.read_csv,
+        }
+
+        extension = os.path.splitext(filepath)[1].lower()
+        if extension not in readers:
+            raise CommandError(f'Unsupported file type "{extension}".')
+
         with open(filepath, encoding='utf-8') as ingredients_file:
-            ingredients = json.load(ingredients_file)
-            for ingredient in ingredients:
-                obj, _ = models.Ingredient.objects.get_or_create(**ingredient)
-                self.stdout.write(f'Loaded "{obj}"')
+            yield from readers[extension](ingredients_file)
 
-        self.stdout.write(
-            self.style.SUCCESS(
-                'Database has been filled successfully!'
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be greater than 0.')
+
+        seen = set(
+            models.Ingredient.objects.values_list('name', 'measurement_unit')
+        )
+
+        total = 0
+        new_ingredients = []
+
+        for name, measurement_unit in self.read_ingredients(options['path']):
+            total += 1
+            key = (name.strip(), measurement_unit.strip())
+            if key in seen:
+                continue
+            seen.add(key)
+            new_ingredients.append(
+                models.Ingredient(name=key[0], measurement_unit=key[1])
             )
+
+        if not options['dry_run']:
+            with transaction.atomic():
+                models.Ingredient.objects.bulk_create(
+                    new_ingredients, batch_size=batch_size
+                )
+
+        self.stdout.write(
+            f'Read {total} rows, '
+            f'skipped {total - len(new_ingredients)} existing or duplicate, '
+            f'{"would load" if options["dry_run"] else "loaded"} '
+            f'{len(new_ingredients)} in '
+            f'{time.perf_counter() - started:.3f}s.'
         )
+
+        if not options['dry_run']:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    'Database has been filled successfully!'
+                )
+            )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from recipes.models import ShoppingListItem
+
+
+class Command(BaseCommand):
+
+    def handle(self, *args, **options):
+        ShoppingListItem.objects.rebuild()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                'Shopping lists have been rebuilt successfully!'
+            )
+        )
@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from recipes.models import Favorite, Recipe, ShoppingCart
+
+User = get_user_model()
+
+
+def count_related(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(
+                **{field: OuterRef('pk')}
+            ).order_by().values(field).annotate(
+                count=Count('pk')
+            ).values('count'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    help = 'Recalculate denormalized favorites, cart and recipes counters'
+
+    def reconcile(self, queryset, field, actual):
+        return queryset.exclude(**{field: actual}).update(**{field: actual})
+
+    def handle(self, *args, **options):
+        counters = (
+            (Recipe.objects.all(), 'favorites_count',
+             count_related(Favorite, 'recipe')),
+            (Recipe.objects.all(), 'cart_count',
+             count_related(ShoppingCart, 'recipe')),
+            (User.objects.all(), 'recipes_count',
+             count_related(Recipe, 'author')),
+        )
+
+        for queryset, field, actual in counters:
+            fixed = self.reconcile(queryset, field, actual)
+            self.stdout.write(
+                f'{queryset.model.__name__}.{field}: fixed {fixed} rows.'
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS('Counters have been reconciled successfully!')
+        )
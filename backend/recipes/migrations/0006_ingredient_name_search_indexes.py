@@ -0,0 +1,41 @@
+from django.db import DatabaseError, migrations, transaction
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS recipes_ingredient_name_prefix '
+        'ON recipes_ingredient (UPPER(name::text) text_pattern_ops)'
+    )
+
+    try:
+        with transaction.atomic():
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            schema_editor.execute(
+                'CREATE INDEX IF NOT EXISTS recipes_ingredient_name_trgm '
+                'ON recipes_ingredient '
+                'USING gin (UPPER(name::text) gin_trgm_ops)'
+            )
+    except DatabaseError:
+        pass
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute('DROP INDEX IF EXISTS recipes_ingredient_name_trgm')
+    schema_editor.execute('DROP INDEX IF EXISTS recipes_ingredient_name_prefix')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_shoppinglistitem'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
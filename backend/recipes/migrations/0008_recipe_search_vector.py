@@ -0,0 +1,72 @@
+# Generated by Django 3.2.3 on 2026-10-18 03:40
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+SEARCH_VECTOR_FUNCTION = """
+CREATE OR REPLACE FUNCTION recipes_recipe_search_vector_update()
+RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(
+            to_tsvector('pg_catalog.russian', coalesce(NEW.name, '')), 'A'
+        )
+        || setweight(
+            to_tsvector('pg_catalog.russian', coalesce(NEW.text, '')), 'B'
+        );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+SEARCH_VECTOR_TRIGGER = """
+CREATE TRIGGER recipes_recipe_search_vector_trigger
+BEFORE INSERT OR UPDATE OF name, text ON recipes_recipe
+FOR EACH ROW EXECUTE PROCEDURE recipes_recipe_search_vector_update()
+"""
+
+
+def create_search_vector_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute(SEARCH_VECTOR_FUNCTION)
+    schema_editor.execute(SEARCH_VECTOR_TRIGGER)
+    schema_editor.execute(
+        'CREATE INDEX recipes_recipe_search_vector '
+        'ON recipes_recipe USING gin (search_vector)'
+    )
+    schema_editor.execute('UPDATE recipes_recipe SET name = name')
+
+
+def drop_search_vector_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute('DROP INDEX IF EXISTS recipes_recipe_search_vector')
+    schema_editor.execute(
+        'DROP TRIGGER IF EXISTS recipes_recipe_search_vector_trigger '
+        'ON recipes_recipe'
+    )
+    schema_editor.execute(
+        'DROP FUNCTION IF EXISTS recipes_recipe_search_vector_update()'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_tags_tag_recipe_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Search vector'),
+        ),
+        migrations.RunPython(
+            create_search_vector_trigger, drop_search_vector_trigger
+        ),
+    ]
@@ -1,10 +1,32 @@
-import os
-
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, RegexValidator
-from django.db import models
-from django.db.models.signals import post_delete, pre_save
+from django.db import models, transaction
+from django.db.models import (
+    Case,
+    Exists,
+    F,
+    OuterRef,
+    Prefetch,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Greatest
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
 from django.dispatch import receiver
+from django.utils import timezone
+
+from utils.cache import bump_version_on_commit, bump_versions_on_commit
+from utils.jobs import enqueue_job
+from utils.models import CountersModel, shift_counter
+from utils.signals import relations_changed
 
 User = get_user_model()
 
@@ -55,7 +77,36 @@ class Ingredient(models.Model):
         return f'{self.name}, {self.measurement_unit}'
 
 
-class Recipe(models.Model):
+class RecipeQuerySet(models.QuerySet):
+
+    def with_related(self):
+        return self.select_related('author').defer(
+            'search_vector'
+        ).prefetch_related(
+            Prefetch(
+                'recipeingredient_set',
+                queryset=RecipeIngredient.objects.select_related(
+                    'ingredient'
+                ),
+            ),
+            'tags',
+        )
+
+    def with_user_flags(self, user):
+        if not user.is_authenticated:
+            return self
+
+        return self.annotate(
+            is_favorited=Exists(
+                Favorite.objects.filter(user=user, recipe=OuterRef('pk'))
+            ),
+            is_in_shopping_cart=Exists(
+                ShoppingCart.objects.filter(user=user, recipe=OuterRef('pk'))
+            ),
+        )
+
+
+class Recipe(CountersModel):
     name = models.CharField(
         max_length=256,
         verbose_name='Name',
@@ -89,15 +140,65 @@ class Recipe(models.Model):
         Tag,
         verbose_name='Tags',
     )
+    image_variants = models.JSONField(
+        default=dict, blank=True, editable=False,
+        verbose_name='Image variants',
+    )
+    search_vector = SearchVectorField(
+        null=True, editable=False,
+        verbose_name='Search vector',
+    )
+    favorites_count = models.PositiveIntegerField(
+        default=0, editable=False,
+        verbose_name='Favorites count',
+    )
+    cart_count = models.PositiveIntegerField(
+        default=0, editable=False,
+        verbose_name='Shopping cart count',
+    )
+
+    objects = RecipeQuerySet.as_manager()
+
+    counter_fields = ('favorites_count', 'cart_count')
+    loaded_image = None
 
     class Meta:
         verbose_name = 'Recipe'
         verbose_name_plural = 'Recipes'
         ordering = ('-id',)
+        indexes = (
+            models.Index(
+                fields=('cooking_time', 'id'),
+                name='recipe_cooking_time_id_idx',
+            ),
+        )
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'image' in field_names:
+            instance.loaded_image = values[field_names.index('image')]
+        return instance
+
+    @property
+    def image_changed(self):
+        return (
+            'image' not in self.get_deferred_fields()
+            and self.image.name != self.loaded_image
+        )
+
+    def get_image_names(self):
+        return [self.image.name, *self.image_variants.values()]
+
+    def get_save_excluded_fields(self):
+        excluded_fields = super().get_save_excluded_fields()
+        if not self.image_changed:
+            excluded_fields.update(('image', 'image_variants'))
+        return excluded_fields
+
 
 class RecipeIngredient(models.Model):
     recipe = models.ForeignKey(
@@ -135,6 +236,10 @@ class Favorite(models.Model):
         Recipe, on_delete=models.CASCADE,
         verbose_name='Recipe',
     )
+    created = models.DateTimeField(
+        default=timezone.now, db_index=True,
+        verbose_name='Created',
+    )
 
     class Meta:
         constraints = (
@@ -159,6 +264,10 @@ class ShoppingCart(models.Model):
         Recipe, on_delete=models.CASCADE,
         verbose_name='Recipe',
     )
+    created = models.DateTimeField(
+        default=timezone.now, db_index=True,
+        verbose_name='Created',
+    )
 
     class Meta:
         constraints = (
@@ -174,15 +283,337 @@ class ShoppingCart(models.Model):
         return f'{self.user} -> {self.recipe}'
 
 
+class RecipeScore(models.Model):
+    recipe = models.OneToOneField(
+        Recipe, primary_key=True, related_name='score',
+        on_delete=models.CASCADE, verbose_name='Recipe',
+    )
+    score = models.FloatField(default=0, verbose_name='Score')
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('-score', '-recipe'),
+                name='recipe_score_order_idx',
+            ),
+        )
+        verbose_name = 'Recipe score'
+        verbose_name_plural = 'Recipe scores'
+
+    def __str__(self):
+        return f'{self.recipe_id}: {self.score}'
+
+
+RECIPE_RELATION_COUNTERS = {
+    Favorite: 'favorites_count',
+    ShoppingCart: 'cart_count',
+}
+
+
+class ShoppingListItemQuerySet(models.QuerySet):
+
+    @staticmethod
+    def get_recipe_amounts(recipe):
+        return ShoppingListItemQuerySet.get_recipes_amounts((recipe,))
+
+    @staticmethod
+    def get_recipes_amounts(recipes):
+        return dict(
+            RecipeIngredient.objects.filter(recipe__in=recipes).values(
+                'ingredient'
+            ).annotate(
+                total=Sum('amount')
+            ).values_list('ingredient', 'total')
+        )
+
+    def shift_amounts(self, user_ids, deltas):
+        deltas = {id: delta for id, delta in deltas.items() if delta}
+        user_ids = set(user_ids)
+
+        if not user_ids or not deltas:
+            return
+
+        with transaction.atomic():
+            self.bulk_create(
+                (
+                    ShoppingListItem(
+                        user_id=user_id, ingredient_id=ingredient_id,
+                        amount=0,
+                    )
+                    for user_id in user_ids
+                    for ingredient_id, delta in deltas.items()
+                    if delta > 0
+                ),
+                ignore_conflicts=True,
+            )
+
+            items = self.filter(user__in=user_ids, ingredient__in=deltas)
+            items.update(
+                amount=Greatest(
+                    Case(
+                        *(
+                            When(ingredient=id, then=F('amount') + delta)
+                            for id, delta in deltas.items()
+                        )
+                    ),
+                    Value(0),
+                )
+            )
+            items.filter(amount=0).delete()
+
+    def shift_recipes(self, user_id, recipe_ids, sign):
+        self.shift_amounts(
+            (user_id,),
+            {
+                id: sign * amount
+                for id, amount in self.get_recipes_amounts(recipe_ids).items()
+            }
+        )
+
+    def add_recipe(self, user_id, recipe_id):
+        self.shift_recipes(user_id, (recipe_id,), 1)
+
+    def remove_recipe(self, user_id, recipe_id):
+        self.shift_recipes(user_id, (recipe_id,), -1)
+
+    def update_recipe(self, recipe_id, old_amounts, new_amounts):
+        deltas = {
+            id: new_amounts.get(id, 0) - old_amounts.get(id, 0)
+            for id in old_amounts.keys() | new_amounts.keys()
+        }
+
+        if not any(deltas.values()):
+            return
+
+        self.shift_amounts(
+            ShoppingCart.objects.filter(
+                recipe=recipe_id
+            ).values_list('user', flat=True),
+            deltas
+        )
+
+    @transaction.atomic
+    def rebuild(self, user_ids=None):
+        items = self.all()
+        shopping_cart = ShoppingCart.objects.all()
+
+        if user_ids is not None:
+            items = items.filter(user__in=user_ids)
+            shopping_cart = shopping_cart.filter(user__in=user_ids)
+
+        items.delete()
+
+        aggregate = shopping_cart.values(
+            'user',
+            ingredient=F('recipe__recipeingredient__ingredient'),
+        ).exclude(
+            ingredient=None
+        ).annotate(
+            amount=Sum('recipe__recipeingredient__amount')
+        ).order_by()
+
+        self.bulk_create(
+            ShoppingListItem(
+                user_id=item['user'],
+                ingredient_id=item['ingredient'],
+                amount=item['amount'],
+            )
+            for item in aggregate
+        )
+
+
+class ShoppingListItem(models.Model):
+    user = models.ForeignKey(
+        User, related_name='shopping_list',
+        on_delete=models.CASCADE, verbose_name='User',
+    )
+    ingredient = models.ForeignKey(
+        Ingredient, on_delete=models.CASCADE,
+        verbose_name='Ingredient',
+    )
+    amount = models.PositiveIntegerField(
+        verbose_name='Amount',
+    )
+
+    objects = ShoppingListItemQuerySet.as_manager()
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=['user', 'ingredient'],
+                name='unique_ingredient_in_shopping_list',
+            ),
+        )
+        verbose_name = 'Shopping list item'
+        verbose_name_plural = 'Shopping list'
+
+    def __str__(self):
+        return f'{self.user} -> {self.ingredient}, {self.amount}'
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tags_cache(sender, *args, **kwargs):
+    bump_version_on_commit('tags')
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_ingredients_cache(sender, *args, **kwargs):
+    bump_version_on_commit('ingredients')
+
+
+@receiver(post_save, sender=Recipe)
+def invalidate_saved_recipe_responses(sender, instance, created,
+                                      *args, **kwargs):
+    keys = [f'recipe:{instance.pk}', 'recipes-content']
+    if created:
+        keys.append('recipes-list')
+    bump_versions_on_commit(keys)
+
+
+@receiver(post_delete, sender=Recipe)
+def invalidate_deleted_recipe_responses(sender, instance, *args, **kwargs):
+    bump_versions_on_commit((f'recipe:{instance.pk}', 'recipes-list'))
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def invalidate_recipe_ingredient_responses(sender, instance,
+                                           *args, **kwargs):
+    bump_versions_on_commit((f'recipe:{instance.recipe_id}',))
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipe_tags_responses(sender, instance, action, reverse,
+                                     pk_set, *args, **kwargs):
+    if action == 'pre_clear':
+        pk_set = set(
+            (instance.recipe_set if reverse else instance.tags).values_list(
+                'pk', flat=True
+            )
+        )
+    elif action not in ('post_add', 'post_remove'):
+        return
+
+    recipe_ids, tag_ids = (
+        (pk_set, (instance.pk,)) if reverse else ((instance.pk,), pk_set)
+    )
+    bump_versions_on_commit(
+        [f'recipe:{id}' for id in recipe_ids]
+        + [f'tag-recipes:{id}' for id in tag_ids]
+    )
+
+
+@receiver(post_save, sender=Tag)
+def invalidate_saved_tag_responses(sender, instance, *args, **kwargs):
+    bump_versions_on_commit((f'tag:{instance.pk}',))
+
+
+@receiver(post_delete, sender=Tag)
+def invalidate_deleted_tag_responses(sender, instance, *args, **kwargs):
+    bump_versions_on_commit(
+        (f'tag:{instance.pk}', f'tag-recipes:{instance.pk}', 'recipes-list')
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_author_responses(sender, instance, *args, **kwargs):
+    bump_versions_on_commit((f'author:{instance.pk}',))
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipes_cache(sender, *args, **kwargs):
+    bump_version_on_commit('recipes')
+
+
+@receiver(post_save, sender=Recipe)
+def post_save_new_recipe(sender, instance, created, raw, *args, **kwargs):
+    if created and not raw:
+        shift_counter(
+            User.objects.filter(pk=instance.author_id), 'recipes_count', 1
+        )
+        RecipeScore.objects.create(recipe=instance)
+
+
+@receiver(post_delete, sender=Recipe)
+def post_delete_recipe_author(sender, instance, *args, **kwargs):
+    shift_counter(
+        User.objects.filter(pk=instance.author_id), 'recipes_count', -1
+    )
+
+
+@receiver(pre_delete, sender=Recipe)
+def pre_delete_recipe_shopping_lists(sender, instance, *args, **kwargs):
+    ShoppingListItem.objects.update_recipe(
+        instance.pk, ShoppingListItem.objects.get_recipe_amounts(instance), {}
+    )
+
+
+@receiver(pre_delete, sender=User)
+def pre_delete_user_relations(sender, instance, *args, **kwargs):
+    for relation_model_cls, field in RECIPE_RELATION_COUNTERS.items():
+        shift_counter(
+            Recipe.objects.filter(
+                pk__in=relation_model_cls.objects.filter(
+                    user=instance
+                ).values('recipe')
+            ),
+            field, -1,
+        )
+
+
+@receiver(relations_changed, sender=Favorite)
+@receiver(relations_changed, sender=ShoppingCart)
+def shift_recipe_relation_counters(sender, ids, delta, *args, **kwargs):
+    shift_counter(
+        Recipe.objects.filter(pk__in=ids),
+        RECIPE_RELATION_COUNTERS[sender], delta
+    )
+
+
+@receiver(relations_changed, sender=ShoppingCart)
+def shift_shopping_list(sender, user_id, ids, delta, *args, **kwargs):
+    ShoppingListItem.objects.shift_recipes(user_id, ids, delta)
+
+
 @receiver(post_delete, sender=Recipe)
 def post_delete_recipe(sender, instance, *args, **kwargs):
-    instance.image.delete(save=False)
+    enqueue_job(
+        'recipes.jobs.delete_recipe_images',
+        names=instance.get_image_names(),
+    )
 
 
 @receiver(pre_save, sender=Recipe)
-def pre_save_recipe(sender, instance, *args, **kwargs):
-    old_instance = Recipe.objects.filter(id=instance.id)
-    if old_instance.exists():
-        old_image_path = old_instance.first().image.path
-        if os.path.exists(old_image_path):
-            os.remove(old_image_path)
+def pre_save_recipe(sender, instance, raw, *args, **kwargs):
+    instance.image_replaced = instance.image_changed
+    if not raw and (instance._state.adding or not instance.image_replaced):
+        return
+
+    old_instance = Recipe.objects.only(
+        'image', 'image_variants'
+    ).filter(pk=instance.pk).first()
+    if not raw:
+        instance.image_variants = {}
+    if old_instance is not None:
+        names = instance.get_image_names()
+        enqueue_job(
+            'recipes.jobs.delete_recipe_images',
+            names=[
+                name for name in old_instance.get_image_names()
+                if name not in names
+            ],
+        )
+
+
+@receiver(post_save, sender=Recipe)
+def post_save_recipe(sender, instance, raw, *args, **kwargs):
+    if not raw and instance.image_replaced and instance.image:
+        enqueue_job(
+            'recipes.jobs.process_recipe_image',
+            recipe_id=instance.pk, image=instance.image.name,
+        )
+    instance.loaded_image = instance.image.name
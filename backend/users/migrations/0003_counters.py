@@ -0,0 +1,41 @@
+# Generated by Django 3.2.3 on 2026-10-18 03:49
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_recipes_count(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    Recipe = apps.get_model('recipes', 'Recipe')
+
+    User.objects.update(
+        recipes_count=Coalesce(
+            Subquery(
+                Recipe.objects.filter(
+                    author=OuterRef('pk')
+                ).order_by().values('author').annotate(
+                    count=Count('pk')
+                ).values('count'),
+                output_field=IntegerField(),
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_auto_20221123_2208'),
+        ('recipes', '0004_auto_20221123_2359'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='recipes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Recipes count'),
+        ),
+        migrations.RunPython(fill_recipes_count, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,17 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+from utils.models import CountersModel
+
+
+class User(CountersModel, AbstractUser):
+    recipes_count = models.PositiveIntegerField(
+        default=0, editable=False,
+        verbose_name='Recipes count',
+    )
+
+    counter_fields = ('recipes_count',)
 
-class User(AbstractUser):
     class Meta(AbstractUser.Meta):
         ordering = ('date_joined',)
         verbose_name = 'User'
@@ -1,9 +1,14 @@
 import djoser.serializers as dj_serializers
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from rest_framework.validators import UniqueTogetherValidator
+from rest_framework.settings import api_settings
 
 from utils.serializers import ReadOnlyRecipeSerializer
+from utils.services import (
+    get_feed_recipes,
+    get_following_ids,
+    get_recipes_limit,
+)
 from .models import Subscription
 
 User = get_user_model()
@@ -33,39 +38,30 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
 
     def get_is_subscribed(self, obj):
-        user = self.context['request'].user
-        return (
-            user.is_authenticated
-            and user.following.filter(following=obj).exists()
-        )
+        return obj.pk in get_following_ids(self.context['request'])
 
 
 class SubscriptionSerializer(serializers.ModelSerializer):
+    unique_message = 'User has already been subscribed.'
 
     class Meta:
         fields = (
             'user', 'following',
         )
         model = Subscription
-        validators = (
-            UniqueTogetherValidator(
-                queryset=Subscription.objects.all(),
-                fields=('user', 'following',),
-                message='User has already been subscribed.',
-            ),
-        )
 
     def validate(self, data):
         if data['user'] == data['following']:
-            raise serializers.ValidationError(
-                ['Can\'t subscribe to self.']
-            )
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Can\'t subscribe to self.'
+                ],
+            })
         return data
 
 
 class FollowingUserSerializer(UserSerializer):
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.ReadOnlyField(source='recipes.count')
 
     class Meta(UserSerializer.Meta):
         fields = (
@@ -75,13 +71,10 @@ class FollowingUserSerializer(UserSerializer):
         )
 
     def get_recipes(self, obj):
-        request = self.context['request']
-        recipes_limit = request.query_params.get('recipes_limit')
-
-        recipes = obj.recipes.all()
-
-        if recipes_limit is not None and recipes_limit.isdigit():
-            recipes = recipes[:int(recipes_limit)]
-
-        serializer = ReadOnlyRecipeSerializer(instance=recipes, many=True)
+        serializer = ReadOnlyRecipeSerializer(
+            instance=get_feed_recipes(
+                obj, get_recipes_limit(self.context['request'])
+            ),
+            many=True,
+        )
         return serializer.data
@@ -2,13 +2,29 @@ from rest_framework import permissions, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from utils.services import alter_model_related_with_user
+from api.pagination import OptionalCursorPagination
+from utils.services import (
+    alter_model_related_with_user,
+    alter_models_related_with_user,
+    get_recipes_limit,
+    with_recipes_feed,
+)
 from .models import Subscription, User
 from .serializers import FollowingUserSerializer, SubscriptionSerializer
 
 
 class SubscriptionViewSet(viewsets.GenericViewSet):
-    queryset = User.objects.all()
+    pagination_class = OptionalCursorPagination
+    cursor_ordering = 'id'
+
+    def get_queryset(self):
+        if self.action == 'subscribe':
+            return User.objects.all()
+
+        return with_recipes_feed(
+            User.objects.order_by('date_joined'),
+            get_recipes_limit(self.request),
+        )
 
     @action(detail=True, methods=('POST', 'DELETE'),
             permission_classes=(permissions.IsAuthenticated,))
@@ -22,12 +38,24 @@ class SubscriptionViewSet(viewsets.GenericViewSet):
             instance_szr_cls=FollowingUserSerializer,
         )
 
+    @action(detail=False, methods=('POST', 'DELETE'),
+            url_path='subscribe', url_name='subscribe-bulk',
+            permission_classes=(permissions.IsAuthenticated,))
+    def subscribe_bulk(self, request):
+        return alter_models_related_with_user(
+            request=request,
+            field_name='following',
+            queryset=User.objects.all(),
+            relation_model_cls=Subscription,
+            relation_szr_cls=SubscriptionSerializer,
+        )
+
     @action(detail=False, methods=('GET',),
             permission_classes=(permissions.IsAuthenticated,),
             serializer_class=FollowingUserSerializer)
     def subscriptions(self, request):
         user = request.user
-        followings = User.objects.filter(
+        followings = self.get_queryset().filter(
             pk__in=Subscription.objects.filter(
                 user=user).values_list('following', flat=True)
         )
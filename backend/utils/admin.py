@@ -0,0 +1,29 @@
+from django.contrib import admin
+
+from .models import Job, StoredFile
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'handler',
+        'status',
+        'attempts',
+        'created',
+        'updated',
+    )
+    list_filter = ('status', 'handler')
+    readonly_fields = ('created', 'updated')
+
+
+class StoredFileAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'name',
+        'references',
+    )
+    search_fields = ('name',)
+
+
+admin.site.register(Job, JobAdmin)
+admin.site.register(StoredFile, StoredFileAdmin)
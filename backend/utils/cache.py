@@ -0,0 +1,250 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+LOOKUP_OUTCOMES = ('hits', 'stale', 'misses')
+
+GENERATION_NAMESPACE = 'generation'
+
+
+def get_version_key(namespace):
+    return f'version:{namespace}'
+
+
+def get_version(namespace):
+    key = get_version_key(namespace)
+    version = cache.get(key)
+
+    if version is not None:
+        return version
+
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key)
+
+
+def increment_version(namespace):
+    key = get_version_key(namespace)
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_version(namespace):
+    increment_version(GENERATION_NAMESPACE)
+    increment_version(namespace)
+
+
+def bump_version_on_commit(namespace):
+    transaction.on_commit(lambda: bump_version(namespace))
+
+
+def get_versions(namespaces):
+    keys = {get_version_key(namespace): namespace for namespace in namespaces}
+    versions = cache.get_many(keys)
+
+    missing = keys.keys() - versions.keys()
+    if missing:
+        for key in missing:
+            cache.add(key, time.time_ns(), timeout=None)
+        versions.update(cache.get_many(missing))
+
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_versions_on_commit(namespaces):
+    namespaces = tuple(namespaces)
+
+    def bump_versions():
+        for namespace in namespaces:
+            bump_version(namespace)
+
+    transaction.on_commit(bump_versions)
+
+
+def get_stats_key(namespace, outcome):
+    return f'stats:{namespace}:{outcome}'
+
+
+def count_lookup(namespace, outcome, count=1):
+    if not count:
+        return
+
+    key = get_stats_key(namespace, outcome)
+
+    try:
+        cache.incr(key, count)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key, count)
+
+
+def get_lookup_stats(namespace):
+    keys = {
+        get_stats_key(namespace, outcome): outcome
+        for outcome in LOOKUP_OUTCOMES
+    }
+    stats = cache.get_many(keys)
+
+    return {outcome: stats.get(key, 0) for key, outcome in keys.items()}
+
+
+def get_request_cache_key(namespace, request):
+    query = '&'.join(
+        f'{name}={value}'
+        for name, values in sorted(request.query_params.lists())
+        for value in sorted(values)
+    )
+    url = request.build_absolute_uri(request.path)
+    digest = hashlib.md5(f'{url}?{query}'.encode()).hexdigest()
+
+    return f'{namespace}:{digest}'
+
+
+def get_lease_key(key):
+    return f'lease:{key}'
+
+
+def get_fresh_values(entries):
+    versions = get_versions(
+        {name for _, entry_versions, _ in entries.values()
+         for name in entry_versions}
+    )
+    now = time.time()
+
+    return {
+        key: value
+        for key, (value, entry_versions, expires) in entries.items()
+        if expires > now and all(
+            versions.get(name) == version
+            for name, version in entry_versions.items()
+        )
+    }
+
+
+def compute_entries(keys, compute, timeout, get_known_keys):
+    known_keys = {key: set(get_known_keys(key)) for key in keys}
+    generation = get_version(GENERATION_NAMESPACE)
+    known_versions = get_versions(set().union(*known_keys.values()))
+
+    computed = compute(keys)
+
+    learned_keys = {
+        key: set(names) - known_keys[key]
+        for key, (_, names) in computed.items()
+    }
+    learned_versions = get_versions(set().union(*learned_keys.values()))
+    settled = get_version(GENERATION_NAMESPACE) == generation
+    now = time.time()
+
+    cache.set_many(
+        {
+            key: (
+                value,
+                {
+                    **{name: known_versions[name] for name in known_keys[key]},
+                    **{
+                        name: learned_versions[name]
+                        for name in learned_keys[key]
+                    },
+                },
+                now + timeout if settled or not learned_keys[key] else now,
+            )
+            for key, (value, _) in computed.items()
+        },
+        timeout + settings.CACHE_STALE_TIMEOUT,
+    )
+
+    return {key: value for key, (value, _) in computed.items()}
+
+
+def get_or_compute_many(namespace, keys, compute, timeout,
+                        get_known_keys=lambda key: ()):
+    entries = cache.get_many(keys)
+    values = get_fresh_values(entries)
+    count_lookup(namespace, 'hits', len(values))
+
+    pending = [key for key in keys if key not in values]
+    deadline = time.monotonic() + settings.CACHE_LEASE_WAIT
+
+    while pending:
+        if time.monotonic() >= deadline:
+            values.update(
+                compute_entries(pending, compute, timeout, get_known_keys)
+            )
+            count_lookup(namespace, 'misses', len(pending))
+            break
+
+        leased = [
+            key for key in pending
+            if cache.add(get_lease_key(key), 1, settings.CACHE_LEASE_TIMEOUT)
+        ]
+        if leased:
+            try:
+                values.update(
+                    compute_entries(leased, compute, timeout, get_known_keys)
+                )
+            finally:
+                cache.delete_many([get_lease_key(key) for key in leased])
+            count_lookup(namespace, 'misses', len(leased))
+
+        stale = {
+            key: entries[key][0]
+            for key in pending if key not in leased and key in entries
+        }
+        values.update(stale)
+        count_lookup(namespace, 'stale', len(stale))
+
+        pending = [
+            key for key in pending if key not in leased and key not in stale
+        ]
+        if not pending:
+            break
+
+        time.sleep(settings.CACHE_LEASE_POLL_INTERVAL)
+        entries = cache.get_many(pending)
+        fresh = get_fresh_values(entries)
+        values.update(fresh)
+        count_lookup(namespace, 'hits', len(fresh))
+        pending = [key for key in pending if key not in fresh]
+
+    return {key: values[key] for key in keys if key in values}
+
+
+def get_or_compute(namespace, key, compute, timeout, known_keys=()):
+    def compute_one(keys):
+        computed = compute()
+        return {} if computed is None else {key: computed}
+
+    return get_or_compute_many(
+        namespace, (key,), compute_one, timeout, lambda key: known_keys
+    ).get(key)
+
+
+def get_fragment_key(namespace, scope, id):
+    return f'{namespace}:{scope}:{id}'
+
+
+def get_cached_fragments(namespace, scope, ids, render, get_keys,
+                         get_known_keys, timeout):
+    keys = {get_fragment_key(namespace, scope, id): id for id in ids}
+
+    def compute(fragment_keys):
+        fragments = render([keys[key] for key in fragment_keys])
+        return {
+            get_fragment_key(namespace, scope, id): (
+                fragment, get_keys(fragment)
+            )
+            for id, fragment in fragments.items()
+        }
+
+    fragments = get_or_compute_many(
+        namespace, keys, compute, timeout,
+        lambda key: get_known_keys(keys[key]),
+    )
+
+    return [fragments[key] for key in keys if key in fragments]
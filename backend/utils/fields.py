@@ -0,0 +1,65 @@
+import io
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from drf_extra_fields.fields import Base64ImageField
+from PIL import Image
+from rest_framework import serializers
+
+from .images import IMAGE_VARIANTS
+
+
+class LimitedBase64ImageField(Base64ImageField):
+
+    def to_internal_value(self, base64_data):
+        if isinstance(base64_data, str):
+            encoded = base64_data.rpartition(';base64,')[2]
+            if len(encoded) * 3 // 4 > settings.RECIPE_IMAGE_MAX_SIZE:
+                raise ValidationError(
+                    'Image size can\'t exceed '
+                    f'{settings.RECIPE_IMAGE_MAX_SIZE // 1024 // 1024} MB.'
+                )
+
+        return super().to_internal_value(base64_data)
+
+    def get_file_extension(self, filename, decoded_file):
+        try:
+            with Image.open(io.BytesIO(decoded_file)) as image:
+                width, height = image.size
+        except OSError:
+            raise ValidationError(self.INVALID_FILE_MESSAGE)
+
+        if width * height > settings.RECIPE_IMAGE_MAX_PIXELS:
+            raise ValidationError(
+                'Image resolution is too large.'
+            )
+
+        return super().get_file_extension(filename, decoded_file)
+
+
+class ImageVariantsField(serializers.Field):
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        kwargs.setdefault('source', '*')
+        super().__init__(**kwargs)
+
+    def get_url(self, storage, name):
+        url = storage.url(name)
+        request = self.context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+    def to_representation(self, recipe):
+        if not recipe.image:
+            return None
+
+        storage = recipe.image.storage
+
+        return {
+            name: self.get_url(
+                storage, recipe.image_variants.get(name, recipe.image.name)
+            )
+            for name in IMAGE_VARIANTS
+        }
@@ -0,0 +1,113 @@
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .cache import bump_versions_on_commit
+
+EXIF_ORIENTATION = 0x0112
+
+IMAGE_VARIANTS = {
+    'thumbnail': ((400, 400), 'JPEG', 'jpg'),
+    'webp': ((1200, 1200), 'WEBP', 'webp'),
+    'thumbnail_webp': ((400, 400), 'WEBP', 'webp'),
+}
+
+
+def render_image_variant(image, size, image_format):
+    variant = image.copy()
+    variant.thumbnail(size)
+
+    if image_format == 'JPEG' and variant.mode != 'RGB':
+        variant = variant.convert('RGB')
+
+    buffer = io.BytesIO()
+    variant.save(buffer, format=image_format, quality=80, optimize=True)
+    return buffer.getvalue()
+
+
+def load_image(image_file):
+    with image_file.open('rb') as source:
+        image = Image.open(source)
+        image.load()
+
+    return image
+
+
+def normalize_image(image_file, image):
+    max_dimension = settings.RECIPE_IMAGE_MAX_DIMENSION
+
+    if (
+        image.getexif().get(EXIF_ORIENTATION, 1) == 1
+        and max(image.size) <= max_dimension
+    ):
+        return None, image
+
+    normalized = ImageOps.exif_transpose(image)
+    normalized.thumbnail((max_dimension, max_dimension))
+
+    buffer = io.BytesIO()
+    normalized.save(buffer, format=image.format)
+    name = image_file.storage.save(
+        image_file.name, ContentFile(buffer.getvalue())
+    )
+
+    return name, normalized
+
+
+def create_image_variants(image_file, image):
+    storage = image_file.storage
+    stem = os.path.splitext(image_file.name)[0]
+
+    Image.init()
+    variants = {}
+
+    for name, (size, image_format, extension) in IMAGE_VARIANTS.items():
+        if image_format not in Image.SAVE:
+            continue
+        variants[name] = storage.save(
+            f'{stem}_{name}.{extension}',
+            ContentFile(render_image_variant(image, size, image_format))
+        )
+
+    return variants
+
+
+def delete_image_variants(storage, variants):
+    for name in variants.values():
+        storage.delete(name)
+
+
+def update_image_variants(recipe):
+    image_file = recipe.image
+    storage = image_file.storage
+    normalized_name = None
+    variants = {}
+
+    try:
+        image = load_image(image_file)
+        normalized_name, image = normalize_image(image_file, image)
+        variants = create_image_variants(image_file, image)
+    except OSError:
+        pass
+
+    new_name = normalized_name or image_file.name
+    updated = type(recipe).objects.filter(
+        pk=recipe.pk, image=image_file.name
+    ).update(image=new_name, image_variants=variants)
+
+    if not updated:
+        if normalized_name:
+            storage.delete(normalized_name)
+        delete_image_variants(storage, variants)
+        return
+
+    if normalized_name:
+        storage.delete(image_file.name)
+    delete_image_variants(storage, recipe.image_variants)
+
+    recipe.image = new_name
+    recipe.image_variants = variants
+    bump_versions_on_commit(('recipes', f'recipe:{recipe.pk}'))
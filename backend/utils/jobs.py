@@ -0,0 +1,50 @@
+import traceback
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+
+def enqueue_job(handler, **payload):
+    return Job.objects.create(handler=handler, payload=payload)
+
+
+def claim_jobs(limit):
+    with transaction.atomic():
+        job_ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.PENDING)
+            .order_by('id')
+            .values_list('id', flat=True)[:limit]
+        )
+        Job.objects.filter(pk__in=job_ids).update(
+            status=Job.RUNNING, attempts=F('attempts') + 1
+        )
+
+    return job_ids
+
+
+def run_job(job_id):
+    job = Job.objects.get(pk=job_id)
+
+    try:
+        import_string(job.handler)(**job.payload)
+    except Exception:
+        job.error = traceback.format_exc()
+        job.status = (
+            Job.FAILED if job.attempts >= settings.JOB_MAX_ATTEMPTS
+            else Job.PENDING
+        )
+    else:
+        job.error = ''
+        job.status = Job.DONE
+
+    job.save(update_fields=('status', 'error', 'updated'))
+    return job.status
+
+
+def requeue_running_jobs():
+    return Job.objects.filter(status=Job.RUNNING).update(status=Job.PENDING)
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from utils.cache import get_lookup_stats
+
+
+class Command(BaseCommand):
+    help = 'Show hit ratio of the response caches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'namespaces', nargs='*',
+            default=[
+                'recipe-responses', 'recipe-fragments',
+                'tags', 'ingredients',
+            ],
+            help='Cache namespaces to report',
+        )
+
+    def handle(self, *args, **options):
+        for namespace in options['namespaces']:
+            stats = get_lookup_stats(namespace)
+            total = sum(stats.values())
+            served = stats['hits'] + stats['stale']
+            ratio = served / total if total else 0
+
+            self.stdout.write(
+                f'{namespace}: {stats["hits"]} hits, '
+                f'{stats["stale"]} stale, {stats["misses"]} misses, '
+                f'hit ratio {ratio:.1%}'
+            )
@@ -0,0 +1,57 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.jobs import claim_jobs, requeue_running_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs in a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=2,
+            help='Number of worker processes',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Seconds to wait when the queue is empty',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once the queue is empty',
+        )
+        parser.add_argument(
+            '--requeue-running', action='store_true',
+            help='Return jobs left running by a stopped worker to the queue',
+        )
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        if processes < 1:
+            raise CommandError('--processes must be greater than 0.')
+
+        if options['requeue_running']:
+            self.stdout.write(f'Requeued {requeue_running_jobs()} jobs.')
+
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup,
+        ) as executor:
+            while True:
+                job_ids = claim_jobs(processes)
+
+                if not job_ids:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                for job_id, status in zip(
+                    job_ids, executor.map(run_job, job_ids)
+                ):
+                    self.stdout.write(f'Job {job_id}: {status}')
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.3 on 2026-10-18 03:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('utils', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Name')),
+                ('references', models.PositiveIntegerField(default=0, verbose_name='References')),
+            ],
+            options={
+                'verbose_name': 'Stored file',
+                'verbose_name_plural': 'Stored files',
+            },
+        ),
+    ]
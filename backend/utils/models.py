@@ -0,0 +1,84 @@
+from django.db import models
+from django.db.models import F
+
+
+class Job(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    handler = models.CharField(max_length=200, verbose_name='Handler')
+    payload = models.JSONField(default=dict, verbose_name='Payload')
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=PENDING,
+        verbose_name='Status',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Attempts'
+    )
+    error = models.TextField(blank=True, verbose_name='Error')
+    created = models.DateTimeField(auto_now_add=True, verbose_name='Created')
+    updated = models.DateTimeField(auto_now=True, verbose_name='Updated')
+
+    class Meta:
+        ordering = ('id',)
+        indexes = (
+            models.Index(fields=('status', 'id'), name='job_status_id_idx'),
+        )
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+
+    def __str__(self):
+        return f'{self.handler} ({self.status})'
+
+
+class StoredFile(models.Model):
+    name = models.CharField(max_length=255, unique=True, verbose_name='Name')
+    references = models.PositiveIntegerField(
+        default=0, verbose_name='References'
+    )
+
+    class Meta:
+        verbose_name = 'Stored file'
+        verbose_name_plural = 'Stored files'
+
+    def __str__(self):
+        return self.name
+
+
+class CountersModel(models.Model):
+    counter_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def get_save_excluded_fields(self):
+        return set(self.counter_fields)
+
+    def save(self, *args, **kwargs):
+        if kwargs.get('update_fields') is None and not self._state.adding:
+            deferred_fields = self.get_deferred_fields()
+            excluded_fields = self.get_save_excluded_fields()
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred_fields
+                and field.name not in excluded_fields
+            ]
+
+        super().save(*args, **kwargs)
+
+
+def shift_counter(queryset, field, delta):
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+
+    return queryset.update(**{field: F(field) + delta})
@@ -0,0 +1,156 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import Case, F, When
+
+from recipes.models import Ingredient, Recipe
+from .cache import get_version
+
+RECIPE_SEARCH_CONFIG = 'pg_catalog.russian'
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+class PrefixIndex:
+
+    def __init__(self, items):
+        self.entries = sorted(
+            (name.casefold(), pk) for pk, name in items
+        )
+        self.keys = [key for key, _ in self.entries]
+
+    def search(self, query, limit):
+        query = query.casefold()
+        result = []
+
+        position = bisect_left(self.keys, query)
+        while (
+            position < len(self.entries)
+            and len(result) < limit
+            and self.keys[position].startswith(query)
+        ):
+            result.append(self.entries[position][1])
+            position += 1
+
+        for key, pk in self.entries:
+            if len(result) >= limit:
+                break
+            if query in key and not key.startswith(query):
+                result.append(pk)
+
+        return result
+
+
+class InvertedIndex:
+    name_weight = 2
+    text_weight = 1
+
+    def __init__(self, items):
+        self.postings = defaultdict(lambda: defaultdict(int))
+
+        for pk, name, text in items:
+            for token in self.tokenize(name):
+                self.postings[token][pk] += self.name_weight
+            for token in self.tokenize(text):
+                self.postings[token][pk] += self.text_weight
+
+    @staticmethod
+    def tokenize(value):
+        return TOKEN_PATTERN.findall(value.casefold())
+
+    def search(self, query):
+        tokens = set(self.tokenize(query))
+        if not tokens:
+            return []
+
+        postings = [self.postings.get(token, {}) for token in tokens]
+        pks = set.intersection(*(set(posting) for posting in postings))
+
+        return sorted(
+            pks,
+            key=lambda pk: (
+                -sum(posting[pk] for posting in postings), -pk
+            )
+        )
+
+
+class VersionedIndex:
+
+    def __init__(self, namespace, index_cls, load):
+        self.namespace = namespace
+        self.index_cls = index_cls
+        self.load = load
+        self.index = None
+        self.version = None
+
+    def get(self):
+        version = get_version(self.namespace)
+
+        if self.index is None or self.version != version:
+            self.index = self.index_cls(self.load())
+            self.version = version
+
+        return self.index
+
+
+ingredient_index = VersionedIndex(
+    'ingredients', PrefixIndex,
+    lambda: Ingredient.objects.values_list('pk', 'name'),
+)
+
+recipe_index = VersionedIndex(
+    'recipes', InvertedIndex,
+    lambda: Recipe.objects.values_list('pk', 'name', 'text'),
+)
+
+
+def order_by_ids(queryset, ids):
+    if not ids:
+        return queryset.none()
+
+    return queryset.filter(pk__in=ids).order_by(
+        Case(*(When(pk=pk, then=position) for position, pk in enumerate(ids)))
+    )
+
+
+def search_ingredients(queryset, name, limit=None):
+    limit = limit or settings.INGREDIENT_SEARCH_LIMIT
+
+    if connection.vendor != 'postgresql':
+        return order_by_ids(
+            queryset, ingredient_index.get().search(name, limit)
+        )
+
+    ids = list(
+        queryset.filter(
+            name__istartswith=name
+        ).order_by('name').values_list('pk', flat=True)[:limit]
+    )
+
+    if len(ids) < limit:
+        ids += queryset.filter(
+            name__icontains=name
+        ).exclude(
+            name__istartswith=name
+        ).order_by('name').values_list('pk', flat=True)[:limit - len(ids)]
+
+    return order_by_ids(queryset, ids)
+
+
+def search_recipes(queryset, text):
+    if connection.vendor != 'postgresql':
+        return order_by_ids(queryset, recipe_index.get().search(text))
+
+    query = SearchQuery(
+        text, config=RECIPE_SEARCH_CONFIG, search_type='websearch'
+    )
+
+    return queryset.filter(
+        search_vector=query
+    ).annotate(
+        search_rank=SearchRank(F('search_vector'), query)
+    ).order_by('-search_rank', '-id')
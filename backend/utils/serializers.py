@@ -1,15 +1,26 @@
+from django.conf import settings
 from rest_framework import serializers
 
 from recipes.models import Recipe
+from .fields import ImageVariantsField
 
 
 class ReadOnlyRecipeSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
 
     class Meta:
         fields = (
-            'id', 'name', 'image', 'cooking_time',
+            'id', 'name', 'image', 'image_variants', 'cooking_time',
         )
         read_only_fields = (
             'id', 'name', 'image', 'cooking_time',
         )
         model = Recipe
+
+
+class IdListSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.BULK_RELATION_MAX_IDS,
+    )
@@ -1,8 +1,138 @@
-from django.db.models import F, Sum
-from rest_framework import status
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router, transaction
+from django.db.models import F, OuterRef, Prefetch, Subquery
+from rest_framework import serializers, status
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from recipes.models import Recipe, Tag
+from .cache import get_or_compute, get_version
+from .serializers import IdListSerializer
+from .signals import relations_changed
+
+User = get_user_model()
+
+
+def get_following_ids(request):
+    if not hasattr(request, 'following_ids'):
+        user = request.user
+        request.following_ids = (
+            set(user.following.values_list('following', flat=True))
+            if user.is_authenticated else set()
+        )
+
+    return request.following_ids
+
+
+def get_tag_ids(slugs):
+    if not slugs:
+        return []
+
+    ids_by_slug = get_or_compute(
+        namespace='tag-ids',
+        key='tags:ids-by-slug',
+        compute=lambda: (
+            dict(Tag.objects.values_list('slug', 'pk')), ('tags',)
+        ),
+        timeout=settings.REFERENCE_DATA_CACHE_TIMEOUT,
+        known_keys=('tags',),
+    )
+
+    return [ids_by_slug[slug] for slug in slugs if slug in ids_by_slug]
+
+
+FEED_RECIPE_FIELDS = (
+    'id', 'author', 'name', 'image', 'image_variants', 'cooking_time',
+)
+
+
+def get_recipes_limit(request):
+    recipes_limit = request.query_params.get('recipes_limit')
+
+    if recipes_limit is not None and recipes_limit.isdigit():
+        return int(recipes_limit)
+
+    return None
+
 
-from recipes.models import RecipeIngredient
+def get_feed_recipes(user, recipes_limit=None):
+    if hasattr(user, 'feed_recipes'):
+        return user.feed_recipes
+
+    return user.recipes.only(*FEED_RECIPE_FIELDS)[:recipes_limit]
+
+
+def with_recipes_feed(users, recipes_limit=None):
+    recipes = Recipe.objects.only(*FEED_RECIPE_FIELDS)
+
+    if recipes_limit is not None:
+        recipes = recipes.filter(
+            pk__in=Subquery(
+                Recipe.objects.filter(
+                    author=OuterRef('author')
+                ).values('pk')[:recipes_limit]
+            )
+        )
+
+    return users.prefetch_related(
+        Prefetch('recipes', queryset=recipes, to_attr='feed_recipes')
+    )
+
+
+def send_relations_changed(relation_model_cls, user, ids, delta):
+    if ids:
+        relations_changed.send(
+            sender=relation_model_cls, user_id=user.pk, ids=ids, delta=delta,
+        )
+
+
+def lock_user(user):
+    User.objects.select_for_update().filter(pk=user.pk).exists()
+
+
+def add_relations(relation_model_cls, user, field, ids):
+    lock_user(user)
+
+    existing_ids = set(
+        relation_model_cls.objects.select_for_update().filter(
+            user=user, **{f'{field.attname}__in': ids}
+        ).values_list(field.attname, flat=True)
+    )
+    created_ids = [id for id in ids if id not in existing_ids]
+
+    relation_model_cls.objects.bulk_create(
+        (
+            relation_model_cls(user=user, **{field.attname: id})
+            for id in created_ids
+        ),
+        ignore_conflicts=True,
+    )
+    send_relations_changed(relation_model_cls, user, created_ids, 1)
+
+    return created_ids
+
+
+def remove_relations(relation_model_cls, user, field, ids):
+    relations = relation_model_cls.objects.filter(
+        user=user, **{f'{field.attname}__in': ids}
+    )
+    removed_ids = list(
+        relations.select_for_update().values_list(field.attname, flat=True)
+    )
+
+    relations.filter(**{f'{field.attname}__in': removed_ids}).delete()
+    send_relations_changed(relation_model_cls, user, removed_ids, -1)
+
+    return removed_ids
+
+
+def get_non_field_errors(message):
+    return serializers.ValidationError(
+        {api_settings.NON_FIELD_ERRORS_KEY: [message]}
+    )
 
 
 def alter_model_related_with_user(
@@ -11,16 +141,20 @@ def alter_model_related_with_user(
 ):
     user = request.user
     szr_context = {'request': request}
+    field = relation_model_cls._meta.get_field(field_name)
+    using = router.db_for_write(relation_model_cls)
 
     if request.method == 'POST':
-
-        data = {'user': user.pk, field_name: instance.pk}
-        related_instance_szr = relation_szr_cls(
-            data=data, context=szr_context
+        relation_szr_cls(context=szr_context).validate(
+            {'user': user, field_name: instance}
         )
 
-        related_instance_szr.is_valid(raise_exception=True)
-        related_instance_szr.save()
+        with transaction.atomic(using=using):
+            if not add_relations(
+                relation_model_cls, user, field, (instance.pk,)
+            ):
+                raise get_non_field_errors(relation_szr_cls.unique_message)
+
         user_serializer = instance_szr_cls(
             instance=instance, context=szr_context
         )
@@ -29,21 +163,95 @@ def alter_model_related_with_user(
         )
 
     filter_params = {'user': user, field_name: instance.pk}
-    relation_model_cls.objects.filter(**filter_params).delete()
+
+    with transaction.atomic(using=using):
+        deleted, _ = relation_model_cls.objects.filter(
+            **filter_params
+        ).delete()
+        if deleted:
+            send_relations_changed(
+                relation_model_cls, user, (instance.pk,), -1
+            )
 
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-def create_shopping_cart(user):
-    shopping_cart_queryset = RecipeIngredient.objects.filter(
-        recipe__pk__in=(user.shopping_cart.values('recipe__pk'))
-    ).values(
-        name=F('ingredient__name'),
-        measurement_unit=F('ingredient__measurement_unit')
-    ).annotate(amount=Sum('amount'))
+def alter_models_related_with_user(
+        request, field_name, queryset,
+        relation_model_cls, relation_szr_cls
+):
+    ids_serializer = IdListSerializer(data=request.data)
+    ids_serializer.is_valid(raise_exception=True)
+    ids = list(dict.fromkeys(ids_serializer.validated_data['ids']))
+
+    user = request.user
+    field = relation_model_cls._meta.get_field(field_name)
+    using = router.db_for_write(relation_model_cls)
+
+    found_ids = set(
+        queryset.filter(pk__in=ids).values_list('pk', flat=True)
+    )
+    statuses = {id: 'not_found' for id in ids if id not in found_ids}
+
+    if request.method == 'POST':
+        relation_szr = relation_szr_cls(context={'request': request})
+        valid_ids = []
+
+        for id in ids:
+            if id not in found_ids:
+                continue
+            try:
+                relation_szr.validate(
+                    {'user': user, field_name: queryset.model(pk=id)}
+                )
+            except serializers.ValidationError:
+                statuses[id] = 'invalid'
+                continue
+            valid_ids.append(id)
+
+        with transaction.atomic(using=using):
+            changed_ids = add_relations(
+                relation_model_cls, user, field, valid_ids
+            )
+
+        statuses.update((id, 'exists') for id in valid_ids)
+        statuses.update((id, 'created') for id in changed_ids)
+    else:
+        with transaction.atomic(using=using):
+            changed_ids = remove_relations(
+                relation_model_cls, user, field, found_ids
+            )
+
+        statuses.update((id, 'missing') for id in found_ids)
+        statuses.update((id, 'deleted') for id in changed_ids)
+
+    return Response(
+        {'results': [{'id': id, 'status': statuses[id]} for id in ids]},
+        status=status.HTTP_200_OK,
+    )
 
-    return '\n'.join(
-        (f'{ingredient["name"]}, {ingredient["measurement_unit"]} - '
-         f'{ingredient["amount"]}')
-        for ingredient in shopping_cart_queryset
+
+SHOPPING_LIST_CHUNK_SIZE = 500
+
+
+def get_shopping_list(user):
+    return user.shopping_list.values(
+        'amount',
+        name=F('ingredient__name'),
+        measurement_unit=F('ingredient__measurement_unit'),
+    ).order_by('ingredient__name').iterator(
+        chunk_size=SHOPPING_LIST_CHUNK_SIZE
     )
+
+
+def get_shopping_list_etag(user):
+    digest = hashlib.md5(f'{get_version("ingredients")};'.encode())
+
+    items = user.shopping_list.order_by('ingredient').values_list(
+        'ingredient', 'amount'
+    ).iterator(chunk_size=SHOPPING_LIST_CHUNK_SIZE)
+
+    for ingredient_id, amount in items:
+        digest.update(f'{ingredient_id}:{amount};'.encode())
+
+    return digest.hexdigest()
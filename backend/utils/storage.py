@@ -0,0 +1,64 @@
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+from .models import StoredFile
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    content_prefix = 'content'
+
+    def get_content_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+
+        digest = digest.hexdigest()
+        extension = os.path.splitext(name)[1].lower()
+
+        return f'{self.content_prefix}/{digest[:2]}/{digest}{extension}'
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        name = self.get_content_name(name, content)
+
+        with transaction.atomic():
+            stored_file, _ = (
+                StoredFile.objects.select_for_update()
+                .get_or_create(name=name)
+            )
+
+            if not self.exists(name):
+                self._save(name, content)
+
+            stored_file.references = F('references') + 1
+            stored_file.save(update_fields=('references',))
+
+        return name
+
+    def delete(self, name):
+        with transaction.atomic():
+            stored_file = (
+                StoredFile.objects.select_for_update()
+                .filter(name=name).first()
+            )
+
+            if stored_file is not None and stored_file.references > 1:
+                stored_file.references = F('references') - 1
+                stored_file.save(update_fields=('references',))
+                return
+
+            if stored_file is not None:
+                stored_file.delete()
+
+            super().delete(name)
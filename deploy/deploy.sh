@@ -4,5 +4,9 @@ sudo docker compose pull
 sudo docker compose up -d
 sudo docker compose exec backend python manage.py migrate
 sudo docker compose exec backend python manage.py loaddata /data/fixtures.json
+sudo docker compose exec backend python manage.py rebuild_shopping_lists
+sudo docker compose exec backend python manage.py reconcile_counters
+sudo docker compose exec backend python manage.py compute_recipe_scores
 sudo docker compose exec backend python manage.py load_fixture_related_images
+sudo docker compose exec backend python manage.py generate_image_variants
 sudo docker compose exec backend python manage.py collectstatic --no-input 